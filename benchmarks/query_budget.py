@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+
+"""
+Query-count budget check: runs the Snowflake connector against a counting fake connection and fails
+when a code path issues more SQL round trips than its budget, catching per-column and per-table (N+1) queries.
+
+Run from the repository root:
+
+    python -m benchmarks.query_budget
+"""
+
+import re
+import sys
+import math
+import uuid
+import argparse
+import logging
+import threading
+from functools import partial
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from connectors.snowflake import SnowflakeConnector, SAMPLE_COLUMN_CHUNK_SIZE
+from generators.yaml_generator import DbtYamlGenerator
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = 'BUDGET'
+
+# (--workers, --async-queries) settings generate_model_yaml is checked under
+EXECUTIONS = [(1, 0), (4, 0), (1, 8), (4, 8)]
+# Queries generate_model_yaml may issue per table, on top of one per extra sample chunk, and per run
+DEFAULT_PER_TABLE = 2
+DEFAULT_CONSTANT = 4
+
+# Column names and Snowflake types cycled through to build each fake table
+_COLUMNS = [('ID', 'NUMBER'), ('CUSTOMER_NAME', 'TEXT'), ('ORDER_AMOUNT', 'NUMBER'), ('CREATED_DATE', 'DATE'),
+            ('IS_ACTIVE', 'BOOLEAN'), ('STATUS', 'TEXT'), ('ITEM_COUNT', 'NUMBER'), ('CITY', 'TEXT')]
+
+@dataclass
+class SchemaShape:
+    """Number of tables and columns per table served by the fake connection"""
+    tables: int
+    columns: int
+    
+    def table_names(self) -> List[str]:
+        """Get the fake table names"""
+        return [f"TABLE_{index}" for index in range(self.tables)]
+    
+    def columns_of(self, table: str) -> List[Tuple[str, str]]:
+        """Get the (name, type) of every column of a fake table"""
+        columns = []
+        for index in range(self.columns):
+            name, data_type = _COLUMNS[index % len(_COLUMNS)]
+            columns.append((name if index < len(_COLUMNS) else f"{name}_{index}", data_type))
+        return columns
+
+class CountingConnection:
+    """Fake Snowflake connection answering metadata and sample queries for a schema shape, counting every statement"""
+    
+    def __init__(self, shape: SchemaShape, ai_available: bool = False):
+        """Initialize with the schema to serve and whether the Cortex AI functions exist"""
+        self.shape = shape
+        self.ai_available = ai_available
+        self._lock = threading.Lock()
+        self.statements: List[str] = []
+        # Results and errors of queries submitted with execute_async, by query id
+        self._async_results: Dict[str, Tuple[List[Tuple], Optional[Exception]]] = {}
+    
+    def cursor(self) -> 'CountingCursor':
+        """Open a cursor"""
+        return CountingCursor(self)
+    
+    def record(self, sql: str) -> None:
+        """Count one round trip"""
+        with self._lock:
+            self.statements.append(' '.join(sql.split()))
+    
+    def get_query_status_throw_if_error(self, query_id: str) -> str:
+        """Raise the error of a failed async query, fake queries finish as soon as they are submitted"""
+        error = self._async_results[query_id][1]
+        if error is not None:
+            raise error
+        return 'SUCCESS'
+    
+    def is_still_running(self, status: str) -> bool:
+        """Fake queries are never running"""
+        return False
+    
+    def counts(self) -> Dict[str, int]:
+        """Get the number of queries and session tag changes since the last reset"""
+        with self._lock:
+            tags = sum(1 for sql in self.statements if sql.upper().startswith('ALTER SESSION'))
+            return {'queries': len(self.statements) - tags, 'tag_changes': tags}
+    
+    def reset(self) -> None:
+        """Forget the statements counted so far"""
+        with self._lock:
+            self.statements = []
+    
+    def close(self) -> None:
+        """Nothing to close"""
+
+class CountingCursor:
+    """Cursor of a CountingConnection"""
+    
+    def __init__(self, connection: CountingConnection):
+        """Initialize for a counting connection"""
+        self.connection = connection
+        self.description = None
+        self.rowcount = None
+        self.sfqid: Optional[str] = None
+        self._rows: List[Tuple] = []
+    
+    def execute(self, sql: str, *args: Any, **kwargs: Any) -> 'CountingCursor':
+        """Count the statement and load a fake result for it"""
+        self.connection.record(sql)
+        query = ' '.join(sql.split())
+        shape = self.connection.shape
+        self.description = None
+        self._rows = []
+        
+        if query.startswith('SHOW TABLES'):
+            fields = ['created_on', 'name', 'database_name', 'schema_name', 'kind', 'comment', 'rows', 'bytes', 'last_altered']
+            self.description = [(name,) for name in fields]
+            self._rows = [(None, table, 'DB', SCHEMA, 'TABLE', '', 100, 4096, None) for table in shape.table_names()]
+        elif query.startswith('SHOW DATABASES'):
+            self._rows = [(None, 'DB')]
+        elif query.startswith('SHOW SCHEMAS'):
+            self._rows = [(None, SCHEMA), (None, 'INFORMATION_SCHEMA')]
+        elif 'AI_DESCRIBE_' in query:
+            if not self.connection.ai_available:
+                raise RuntimeError("Unknown function AI_DESCRIBE")
+            if 'AI_DESCRIBE_COLUMNS' in query:
+                table = re.search(r"'[^.']*\.([^']*)'", query).group(1)
+                self._rows = [({name: f"Describes {name}" for name, _ in shape.columns_of(table)},)]
+            else:
+                self._rows = [("Table described by Cortex",)]
+        elif 'information_schema.columns' in query and 'table_name =' not in query:
+            self._rows = [(table, name, data_type, 'YES', None, None, None, None, None)
+                          for table in shape.table_names() for name, data_type in shape.columns_of(table)]
+        elif 'information_schema' in query:
+            # Per-table comments and change timestamps: none are set
+            self._rows = []
+        elif query.startswith('DESCRIBE TABLE'):
+            table = query.rsplit('.', 1)[-1]
+            self._rows = [(name, data_type, 'COLUMN', 'Y') for name, data_type in shape.columns_of(table)]
+        elif query.startswith('SELECT COUNT(*)'):
+            # Server-side profile: a fixed value per aggregate function, in select list order
+            values = {'COUNT': 20, 'COUNT_IF': 0, 'APPROX_COUNT_DISTINCT': 5, 'MIN': 0, 'MAX': 4, 'AVG': 2,
+                      'APPROX_TOP_K': '[["value 0", 4], ["value 1", 4]]'}
+            select = query[len('SELECT '):query.index(' FROM ')]
+            self._rows = [tuple(values[function] for function in re.findall(r'(\w+)\([^)]*\)', select))]
+        elif query.startswith('SELECT') and ' SAMPLE ' in query:
+            names = [name.strip() for name in query[len('SELECT '):query.index(' FROM ')].split(',')]
+            self._rows = [tuple(f"{name.lower()} {row % 5}" for name in names) for row in range(20)]
+        self.rowcount = len(self._rows)
+        return self
+    
+    def execute_async(self, sql: str, *args: Any, **kwargs: Any) -> Dict[str, str]:
+        """Count the statement and keep its fake result until it is fetched by query id"""
+        self.sfqid = str(uuid.uuid4())
+        try:
+            self.execute(sql)
+            result = (self._rows, None)
+        except Exception as e:
+            result = ([], e)
+        with self.connection._lock:
+            self.connection._async_results[self.sfqid] = result
+        return {'queryId': self.sfqid}
+    
+    def get_results_from_sfqid(self, query_id: str) -> None:
+        """Load the fake result of an async query"""
+        self._rows = self.connection._async_results[query_id][0]
+        self.rowcount = len(self._rows)
+    
+    def fetchall(self) -> List[Tuple]:
+        """Return the fake rows"""
+        return list(self._rows)
+    
+    def fetchone(self) -> Optional[Tuple]:
+        """Return the first fake row"""
+        return self._rows[0] if self._rows else None
+    
+    def close(self) -> None:
+        """Nothing to close"""
+
+class CountingSnowflakeConnector(SnowflakeConnector):
+    """Snowflake connector whose connections are counting fakes instead of Snowflake sessions"""
+    
+    def __init__(self, shape: SchemaShape, ai_available: bool = False):
+        """Initialize without credentials or a capability cache"""
+        super().__init__({'account': 'budget', 'database': 'DB', 'schema': SCHEMA})
+        self.fake = CountingConnection(shape, ai_available)
+    
+    def _open_connection(self) -> Any:
+        """Hand out the counting connection"""
+        self.governor.register(self.fake)
+        return self.fake
+
+@dataclass
+class BudgetResult:
+    """Outcome of one budget check"""
+    name: str
+    queries: int
+    budget: int
+    tag_changes: int
+    tag_budget: int
+    
+    @property
+    def passed(self) -> bool:
+        """Whether both the query and the tag change counts stayed within budget"""
+        return self.queries <= self.budget and self.tag_changes <= self.tag_budget
+
+def _measure(name: str, shape: SchemaShape, ai_available: bool, budget: int, tag_budget: int,
+             run: Callable[[CountingSnowflakeConnector], Any], workers: int = 1,
+             async_queries: int = 0) -> BudgetResult:
+    """Run a code path on a fresh connector and count the round trips after connecting"""
+    connector = CountingSnowflakeConnector(shape, ai_available)
+    connector.connect()
+    if workers > 1:
+        connector.create_pool(workers)
+        name += f" --workers {workers}"
+    if async_queries > 0:
+        connector.enable_async(async_queries)
+        name += f" --async-queries {async_queries}"
+    try:
+        connector.fake.reset()
+        run(connector)
+        counts = connector.fake.counts()
+    finally:
+        connector.close()
+    return BudgetResult(f"{name} [{shape.tables} tables x {shape.columns} columns{', AI' if ai_available else ''}]",
+                        counts['queries'], budget, counts['tag_changes'], tag_budget)
+
+def _generate(connector: CountingSnowflakeConnector, workers: int = 1) -> None:
+    """List the tables and build the models of the whole schema"""
+    tables = connector.get_tables(SCHEMA)
+    DbtYamlGenerator(connector, {"tests": []}).generate_model_yaml(SCHEMA, tables, workers)
+
+def _describe_table(connector: CountingSnowflakeConnector) -> None:
+    """Describe one table"""
+    connector.get_table_description(SCHEMA, 'TABLE_0')
+
+def _describe_columns(connector: CountingSnowflakeConnector) -> None:
+    """Describe the columns of one table"""
+    connector.get_column_descriptions(SCHEMA, 'TABLE_0')
+
+def _describe_both(connector: CountingSnowflakeConnector) -> None:
+    """Describe one table and its columns, which should share the column metadata"""
+    connector.get_table_description(SCHEMA, 'TABLE_0')
+    connector.get_column_descriptions(SCHEMA, 'TABLE_0')
+
+def check_budgets(shapes: List[SchemaShape], per_table: int, constant: int) -> List[BudgetResult]:
+    """Run every budgeted code path for each schema shape, with and without the Cortex AI functions"""
+    results = []
+    for shape in shapes:
+        chunks = math.ceil(shape.columns / SAMPLE_COLUMN_CHUNK_SIZE)
+        for ai_available in (False, True):
+            # Listing plus bulk columns, then per table: column comments and chunked samples, or the AI lookups;
+            # single-table paths may switch the query tag at most once per query
+            for workers, async_queries in EXECUTIONS:
+                results.append(_measure('generate_model_yaml', shape, ai_available,
+                                        (per_table + chunks - 1) * shape.tables + constant,
+                                        per_table * shape.tables + constant, partial(_generate, workers=workers),
+                                        workers, async_queries))
+            # AI lookup, comment and column list
+            results.append(_measure('get_table_description', shape, ai_available, 3, 3, _describe_table))
+            # AI lookup, comments, column list and one sample per chunk of columns
+            results.append(_measure('get_column_descriptions', shape, ai_available, 3 + chunks, 3 + chunks, _describe_columns))
+            results.append(_measure('table and column descriptions', shape, ai_available, 5 + chunks, 5 + chunks, _describe_both))
+    return results
+
+def main() -> int:
+    """Check the round-trip budgets and exit non-zero if any is exceeded"""
+    parser = argparse.ArgumentParser(description='Fail when code paths issue more SQL round trips than their budget')
+    parser.add_argument('--tables', type=int, nargs='+', default=[1, 5, 25], help='Table counts to check')
+    parser.add_argument('--columns', type=int, nargs='+', default=[4, 40, 250], help='Column counts per table to check')
+    parser.add_argument('--per-table', type=int, default=DEFAULT_PER_TABLE,
+                        help='Queries allowed per table by generate_model_yaml, on top of one per extra sample chunk')
+    parser.add_argument('--constant', type=int, default=DEFAULT_CONSTANT,
+                        help='Queries allowed per generate_model_yaml run regardless of size')
+    args = parser.parse_args()
+    
+    shapes = [SchemaShape(tables, columns) for tables in args.tables for columns in args.columns]
+    results = check_budgets(shapes, args.per_table, args.constant)
+    for result in results:
+        logger.info(f"{'ok  ' if result.passed else 'FAIL'} {result.name}: {result.queries}/{result.budget} queries, "
+                    f"{result.tag_changes}/{result.tag_budget} query tag changes")
+    
+    failed = [result for result in results if not result.passed]
+    if failed:
+        logger.error(f"{len(failed)} of {len(results)} query budgets exceeded")
+        return 1
+    logger.info(f"All {len(results)} query budgets met")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+    # Only the budget report is of interest, not the connector's own progress logs
+    logging.getLogger('connectors').setLevel(logging.ERROR)
+    logging.getLogger('generators').setLevel(logging.ERROR)
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+"""
+spaCy pipeline benchmark: model-load time and documents per second for each pipeline profile.
+
+Run from the repository root:
+
+    python -m benchmarks.spacy_pipeline --model en_core_web_sm --docs 500 --output spacy.json
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import logging
+import platform
+from typing import Any, Dict, List
+
+from benchmarks.synthetic import TEXT_VALUES
+from utils.description_generator import (
+    load_pipeline,
+    DEFAULT_SPACY_MODEL,
+    SPACY_PIPELINES,
+    DEFAULT_NLP_BATCH_SIZE,
+    DEFAULT_NLP_PROCESSES
+)
+
+logger = logging.getLogger(__name__)
+
+def sample_texts(count: int, values_per_doc: int, seed: int) -> List[str]:
+    """Build documents shaped like the joined column samples the description generator analyzes"""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(TEXT_VALUES) for _ in range(values_per_doc)) for _ in range(count)]
+
+def measure(model: str, pipeline: str, texts: List[str], batch_size: int, n_process: int) -> Dict[str, Any]:
+    """Load a pipeline profile and run it over every text, one document at a time and batched through nlp.pipe"""
+    start = time.perf_counter()
+    nlp = load_pipeline(model, pipeline)
+    load_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    entities = sum(len(nlp(text).ents) for text in texts)
+    seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    batched_entities = sum(len(doc.ents) for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process))
+    batched_seconds = time.perf_counter() - start
+    return {
+        'pipeline': pipeline,
+        'components': list(nlp.pipe_names),
+        'load_seconds': load_seconds,
+        'docs': len(texts),
+        'seconds': seconds,
+        'docs_per_second': len(texts) / seconds if seconds else None,
+        'batched_seconds': batched_seconds,
+        'batched_docs_per_second': len(texts) / batched_seconds if batched_seconds else None,
+        # Profiles and batching should find the same entities; a difference means a needed component was dropped
+        'entities': entities,
+        'batched_entities': batched_entities
+    }
+
+def main() -> int:
+    """Benchmark every pipeline profile and write the results as JSON"""
+    parser = argparse.ArgumentParser(description='Model-load time and docs/sec of the spaCy pipeline profiles')
+    parser.add_argument('--model', default=DEFAULT_SPACY_MODEL, help='spaCy model package name or local model directory')
+    parser.add_argument('--pipelines', nargs='+', choices=SPACY_PIPELINES, default=list(reversed(SPACY_PIPELINES)),
+                        help='Pipeline profiles to compare')
+    parser.add_argument('--docs', type=int, default=500, help='Number of documents per profile')
+    parser.add_argument('--values-per-doc', type=int, default=100, help='Sample values joined into each document')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the documents')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_NLP_BATCH_SIZE, help='Documents per nlp.pipe batch')
+    parser.add_argument('--n-process', type=int, default=DEFAULT_NLP_PROCESSES, help='Processes used by nlp.pipe')
+    parser.add_argument('--output', help='File to write the JSON results to (defaults to stdout)')
+    args = parser.parse_args()
+    
+    texts = sample_texts(args.docs, args.values_per_doc, args.seed)
+    runs = []
+    for pipeline in args.pipelines:
+        run = measure(args.model, pipeline, texts, args.batch_size, args.n_process)
+        logger.info(f"{pipeline}: loaded {', '.join(run['components'])} in {run['load_seconds']:.2f}s, "
+                    f"{run['docs_per_second']:.1f} docs/s one at a time, {run['batched_docs_per_second']:.1f} docs/s "
+                    f"batched, {run['entities']} entities")
+        runs.append(run)
+    
+    results = {
+        'benchmark': 'spacy_pipeline',
+        'model': args.model,
+        'values_per_doc': args.values_per_doc,
+        'batch_size': args.batch_size,
+        'n_process': args.n_process,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': runs
+    }
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+        logger.info(f"Wrote benchmark results to {args.output}")
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(main())
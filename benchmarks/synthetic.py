@@ -0,0 +1,127 @@
+"""
+Synthetic schema generator writing SQLite files for offline benchmarks.
+"""
+
+import os
+import random
+import sqlite3
+import datetime
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+# Column kinds with the SQL type they are declared as, so the description rules for each kind are exercised
+COLUMN_TYPES = {
+    'id': 'INTEGER',
+    'text': 'VARCHAR(100)',
+    'amount': 'NUMBER(12,2)',
+    'date': 'DATE',
+    'flag': 'BOOLEAN',
+    'count': 'INTEGER'
+}
+
+DEFAULT_TYPE_MIX = {'id': 2, 'text': 4, 'amount': 1, 'date': 1, 'flag': 1, 'count': 1}
+
+# Words the table and column names are built from
+_NOUNS = ['customer', 'order', 'product', 'account', 'invoice', 'store', 'region', 'supplier', 'employee',
+          'payment', 'shipment', 'campaign', 'contract', 'warehouse', 'branch', 'ticket', 'device', 'policy']
+_TEXT_SUFFIXES = ['name', 'status', 'code', 'category', 'description', 'city', 'country', 'email']
+TEXT_VALUES = ['London', 'Paris', 'Acme Corporation', 'John Smith', 'active', 'pending', 'closed', 'Toronto',
+                'Maria Garcia', 'Globex Inc', 'premium', 'standard', 'New York', 'Berlin', 'Initech LLC', 'Tokyo']
+
+@dataclass
+class SyntheticSchema:
+    """Shape of a generated schema"""
+    tables: int = 20
+    columns: int = 12
+    rows: int = 200
+    # Distinct non-null values per column, which bounds how much text spaCy sees per column
+    cardinality: int = 20
+    # Relative weight of each column kind in COLUMN_TYPES
+    type_mix: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_TYPE_MIX))
+    # Share of values that are NULL
+    null_ratio: float = 0.1
+    seed: int = 0
+
+def parse_type_mix(value: str) -> Dict[str, int]:
+    """Parse a type mix such as 'id=2,text=4,amount=1' into weights"""
+    mix = {}
+    for part in value.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in COLUMN_TYPES:
+            raise ValueError(f"Unknown column kind '{kind}', expected one of: {', '.join(COLUMN_TYPES)}")
+        mix[kind] = int(weight) if weight else 1
+    return mix
+
+def _value_pool(kind: str, cardinality: int, rng: random.Random) -> List[Any]:
+    """Build the distinct values a column of a kind draws from"""
+    if kind == 'id':
+        return list(range(1, cardinality + 1))
+    if kind == 'count':
+        return [rng.randint(0, 500) for _ in range(cardinality)]
+    if kind == 'amount':
+        return [round(rng.uniform(0, 10000), 2) for _ in range(cardinality)]
+    if kind == 'date':
+        start = datetime.date(2020, 1, 1)
+        return [(start + datetime.timedelta(days=rng.randint(0, 1500))).isoformat() for _ in range(cardinality)]
+    if kind == 'flag':
+        return [0, 1]
+    return [f"{rng.choice(TEXT_VALUES)} {index}" if index >= len(TEXT_VALUES) else TEXT_VALUES[index]
+            for index in range(cardinality)]
+
+def _column_name(kind: str, table_noun: str, index: int, rng: random.Random) -> str:
+    """Name a column so it matches the naming pattern of its kind"""
+    noun = rng.choice(_NOUNS)
+    if kind == 'id':
+        return f"{table_noun}_id" if index == 0 else f"{noun}_id"
+    if kind == 'amount':
+        return f"{noun}_amount"
+    if kind == 'date':
+        return rng.choice(['created_date', 'updated_date', f"{noun}_date"])
+    if kind == 'flag':
+        return f"is_{noun}"
+    if kind == 'count':
+        return f"{noun}_count"
+    return f"{noun}_{rng.choice(_TEXT_SUFFIXES)}"
+
+def _table_columns(spec: SyntheticSchema, table_noun: str, rng: random.Random) -> List[Tuple[str, str]]:
+    """Pick the (name, kind) of each column of a table following the type mix"""
+    kinds = [kind for kind, weight in spec.type_mix.items() for _ in range(weight)]
+    columns = []
+    names = set()
+    for index in range(spec.columns):
+        kind = 'id' if index == 0 else rng.choice(kinds)
+        name = _column_name(kind, table_noun, index, rng)
+        # Column names must be unique within a table
+        suffix = 2
+        unique_name = name
+        while unique_name in names:
+            unique_name = f"{name}_{suffix}"
+            suffix += 1
+        names.add(unique_name)
+        columns.append((unique_name, kind))
+    return columns
+
+def build_sqlite_schema(path: str, spec: SyntheticSchema) -> Dict[str, int]:
+    """Write a SQLite file with the synthetic schema, returning the number of tables and columns created"""
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(spec.seed)
+    conn = sqlite3.connect(path)
+    column_count = 0
+    try:
+        for table_index in range(spec.tables):
+            table_noun = _NOUNS[table_index % len(_NOUNS)]
+            table = f"{table_noun}_{table_index}"
+            columns = _table_columns(spec, table_noun, rng)
+            column_count += len(columns)
+            conn.execute(f'CREATE TABLE "{table}" ({", ".join(f"{name} {COLUMN_TYPES[kind]}" for name, kind in columns)})')
+            
+            pools = [_value_pool(kind, spec.cardinality, rng) for _, kind in columns]
+            draw: Callable[[List[Any]], Any] = lambda pool: None if rng.random() < spec.null_ratio else rng.choice(pool)
+            rows = [tuple(draw(pool) for pool in pools) for _ in range(spec.rows)]
+            conn.executemany(f'INSERT INTO "{table}" VALUES ({", ".join("?" for _ in columns)})', rows)
+        conn.commit()
+    finally:
+        conn.close()
+    return {'tables': spec.tables, 'columns': column_count}
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+"""
+End-to-end throughput benchmark over synthetic schemas served from the SQLite backend.
+
+Run from the repository root:
+
+    python -m benchmarks.throughput --tables 50 --columns 20 --output results.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import platform
+import statistics
+import tempfile
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak RSS is then left out of the results
+    resource = None
+
+from benchmarks.synthetic import SyntheticSchema, build_sqlite_schema, parse_type_mix, DEFAULT_TYPE_MIX
+from connectors.sqlite import SQLiteConnector
+from generators.yaml_generator import DbtYamlGenerator
+from utils.config_loader import load_tests_config
+from utils.profiler import RunProfiler, CONNECT, YAML_WRITE
+
+logger = logging.getLogger(__name__)
+
+def peak_rss_bytes() -> Optional[int]:
+    """Get the peak resident set size of this process"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def run_once(db_path: str, output_path: str, workers: int, tests_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the full pipeline once over the synthetic database and measure it"""
+    connector = SQLiteConnector({'database': 'synthetic', 'schema': 'main', 'path': db_path})
+    connector.profiler = RunProfiler(phases=True)
+    start = time.perf_counter()
+    with connector.profiler.phase(CONNECT):
+        connector.connect()
+    try:
+        tables = connector.get_tables('main')
+        generator = DbtYamlGenerator(connector, tests_config)
+        yaml_structure = generator.generate_model_yaml('main', tables, workers)
+        with connector.profiler.phase(YAML_WRITE):
+            if not generator.write_yaml_file(yaml_structure, output_path):
+                raise RuntimeError(f"Failed to write {output_path}")
+    finally:
+        connector.close()
+    elapsed = time.perf_counter() - start
+    
+    columns = sum(len(model['columns']) for model in yaml_structure['models'])
+    return {
+        'seconds': elapsed,
+        'tables': len(tables),
+        'columns': columns,
+        'tables_per_second': len(tables) / elapsed,
+        'columns_per_second': columns / elapsed,
+        'queries': connector.governor.summary()['queries'],
+        'phases': {
+            name: {'calls': total['calls'], 'wall_seconds': total['wall'], 'cpu_seconds': total['cpu']}
+            for name, total in connector.profiler.phase_totals().items()
+        }
+    }
+
+def main() -> int:
+    """Generate a synthetic schema, run the pipeline over it and write the results as JSON"""
+    parser = argparse.ArgumentParser(description='End-to-end throughput benchmark on a synthetic schema')
+    parser.add_argument('--tables', type=int, default=20, help='Number of tables in the synthetic schema')
+    parser.add_argument('--columns', type=int, default=12, help='Number of columns per table')
+    parser.add_argument('--rows', type=int, default=200, help='Number of rows per table')
+    parser.add_argument('--cardinality', type=int, default=20, help='Distinct values per column')
+    parser.add_argument('--type-mix', default=','.join(f"{kind}={weight}" for kind, weight in DEFAULT_TYPE_MIX.items()),
+                        help='Relative weights of the column kinds, e.g. id=2,text=4,amount=1,date=1,flag=1,count=1')
+    parser.add_argument('--null-ratio', type=float, default=0.1, help='Share of NULL values')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic schema')
+    parser.add_argument('--workers', type=int, default=1, help='Number of tables processed concurrently')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs, reported individually and as a median')
+    parser.add_argument('--tests-config', help='Tests configuration applied to the generated models')
+    parser.add_argument('--output', help='File to write the JSON results to (defaults to stdout)')
+    args = parser.parse_args()
+    
+    spec = SyntheticSchema(tables=args.tables, columns=args.columns, rows=args.rows, cardinality=args.cardinality,
+                           type_mix=parse_type_mix(args.type_mix), null_ratio=args.null_ratio, seed=args.seed)
+    tests_config = {"tests": []}
+    if args.tests_config:
+        tests_config = load_tests_config(args.tests_config)
+    
+    with tempfile.TemporaryDirectory(prefix='dbt_yaml_benchmark_') as directory:
+        db_path = os.path.join(directory, 'synthetic.db')
+        build_sqlite_schema(db_path, spec)
+        runs = []
+        for index in range(args.repeat):
+            run = run_once(db_path, os.path.join(directory, 'schema.yml'), args.workers, tests_config)
+            logger.info(f"Run {index + 1}: {run['tables']} tables in {run['seconds']:.2f}s "
+                        f"({run['tables_per_second']:.1f} tables/s, {run['queries']} queries)")
+            runs.append(run)
+    
+    results = {
+        'benchmark': 'throughput',
+        'schema': asdict(spec),
+        'workers': args.workers,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': runs,
+        'median': {
+            key: statistics.median(run[key] for run in runs)
+            for key in ('seconds', 'tables_per_second', 'columns_per_second', 'queries')
+        } if runs else {},
+        # Peak over the whole process, including schema generation and every run
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+        logger.info(f"Wrote benchmark results to {args.output}")
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # The per-table progress logs of the pipeline would drown out the benchmark's own
+    logging.getLogger('generators').setLevel(logging.WARNING)
+    logging.getLogger('connectors').setLevel(logging.WARNING)
+    sys.exit(main())
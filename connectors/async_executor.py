@@ -0,0 +1,235 @@
+"""
+Asynchronous query execution for Snowflake using async query submission.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from connectors.capabilities import (
+    is_unavailable_error,
+    AI_DESCRIBE_TABLE,
+    AI_DESCRIBE_COLUMNS,
+    TABLE_COMMENTS,
+    COLUMN_COMMENTS
+)
+from connectors.governor import QueryBudgetExceeded, METADATA, COMMENTS, AI, SAMPLE, PROFILE
+
+logger = logging.getLogger(__name__)
+
+class AsyncQueryExecutor:
+    """Submits Snowflake queries with execute_async and polls their results from one event loop"""
+    
+    def __init__(self, connector, max_in_flight: int = 32, poll_interval: float = 0.1, max_poll_interval: float = 2.0):
+        """Initialize with a connected SnowflakeConnector and a cap on queries running at once"""
+        self.connector = connector
+        self.max_in_flight = max(1, max_in_flight)
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+    
+    def prefetch(self, schema: str, tables: List[str]) -> None:
+        """Load metadata, AI descriptions and samples for the tables into the connector's run cache"""
+        if tables:
+            asyncio.run(self._prefetch_tables(schema, tables))
+    
+    async def run_query(self, sql: str, semaphore: asyncio.Semaphore, fetch: Optional[Callable[[Any], Any]] = None,
+                        phase: str = METADATA, table: Optional[str] = None) -> Any:
+        """Submit a query without blocking a thread while it runs, then fetch its rows (or apply fetch to the cursor)"""
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            governor = self.connector.governor
+            # Wait for a governor slot by polling, blocking on it would tie up the threads that poll running queries
+            while not governor.try_acquire(phase):
+                await asyncio.sleep(self.poll_interval)
+            
+            start = time.perf_counter()
+            conn = self.connector.conn
+            cursor = conn.cursor()
+            result = None
+            error = None
+            
+            def submit() -> None:
+                # Switch the session's query tag and submit under one lock so concurrent phases don't interleave
+                with governor.tagged(conn, phase, self.connector.tracer):
+                    cursor.execute_async(sql)
+            
+            try:
+                # Submission and status checks are short calls, the query itself runs in Snowflake
+                await loop.run_in_executor(None, submit)
+                query_id = cursor.sfqid
+                
+                delay = self.poll_interval
+                while True:
+                    status = await loop.run_in_executor(None, conn.get_query_status_throw_if_error, query_id)
+                    if not conn.is_still_running(status):
+                        break
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_poll_interval)
+                
+                await loop.run_in_executor(None, cursor.get_results_from_sfqid, query_id)
+                result = await loop.run_in_executor(None, fetch or (lambda result: result.fetchall()), cursor)
+                return result
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                cursor.close()
+                governor.release(time.perf_counter() - start)
+                # Recorded from submission to fetch, so the span covers the polling the query spent in Snowflake
+                self.connector.tracer.add(sql, phase, table, start, result, getattr(cursor, 'rowcount', None), error)
+    
+    async def _prefetch_tables(self, schema: str, tables: List[str]) -> None:
+        """Prefetch every table concurrently, bounded by the in-flight query cap"""
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        
+        # Probe unknown capabilities on one table first so the rest of the window skips dead paths
+        capabilities = self.connector.capabilities
+        if any(capabilities.is_available(name) is None for name in (AI_DESCRIBE_TABLE, AI_DESCRIBE_COLUMNS, TABLE_COMMENTS)):
+            await self._prefetch_table(schema, tables[0], semaphore)
+            tables = tables[1:]
+        
+        await asyncio.gather(*(self._prefetch_table(schema, table, semaphore) for table in tables))
+        logger.info(f"Prefetched metadata and samples for tables in schema {schema}")
+    
+    async def _prefetch_table(self, schema: str, table: str, semaphore: asyncio.Semaphore) -> None:
+        """Prefetch everything get_table_description and get_column_descriptions need for one table"""
+        connector = self.connector
+        cache = connector.cache
+        
+        async def optional(sql: str, capability: str, phase: str) -> Optional[List[Tuple]]:
+            capabilities = connector.capabilities
+            if capabilities.is_available(capability) is False:
+                return None
+            if not connector.governor.allows(phase):
+                connector.governor.refuse(phase)
+                return None
+            # Wait for a probe already running without blocking the event loop or its executor threads
+            probing = capabilities.try_acquire_probe(capability)
+            while probing is None:
+                await asyncio.sleep(self.poll_interval)
+                probing = capabilities.try_acquire_probe(capability)
+            try:
+                if capabilities.is_available(capability) is False:
+                    return None
+                rows = await self.run_query(sql, semaphore, phase=phase, table=f"{schema}.{table}")
+                capabilities.record(capability, True)
+                return rows
+            except QueryBudgetExceeded:
+                return None
+            except Exception as e:
+                if is_unavailable_error(e):
+                    logger.info(f"{capability} not available for {schema}.{table}: {e}")
+                    capabilities.record(capability, False)
+                else:
+                    logger.warning(f"{capability} lookup failed for {schema}.{table}: {e}")
+                return None
+            finally:
+                if probing:
+                    capabilities.release_probe(capability)
+        
+        # Column list, comments and AI lookups are independent of each other, so submit them together
+        columns = cache.get('columns', schema, table)
+        column_comments = cache.get('column_comments', schema, table)
+        lookups = {
+            'ai_table_description': optional(f"SELECT AI_DESCRIBE_TABLE('{schema}.{table}')", AI_DESCRIBE_TABLE, AI),
+            'ai_column_descriptions': optional(f"SELECT AI_DESCRIBE_COLUMNS('{schema}.{table}')", AI_DESCRIBE_COLUMNS, AI),
+        }
+        if not cache.contains('table_comment', schema, table):
+            lookups['table_comment'] = optional(connector._table_comment_sql(schema, table), TABLE_COMMENTS, COMMENTS)
+        if columns is None:
+            lookups['columns'] = self.run_query(f"DESCRIBE TABLE {schema}.{table}", semaphore, table=f"{schema}.{table}")
+        if column_comments is None:
+            lookups['column_comments'] = optional(connector._column_comments_sql(schema, table), COLUMN_COMMENTS, COMMENTS)
+        
+        results = dict(zip(lookups.keys(), await asyncio.gather(*lookups.values(), return_exceptions=True)))
+        
+        for kind in ('ai_table_description', 'table_comment'):
+            if kind in results:
+                rows = results[kind]
+                cache.put(kind, schema, table, rows[0][0] if rows and rows[0][0] else None)
+        
+        rows = results['ai_column_descriptions']
+        ai_columns = rows[0][0] if rows and isinstance(rows[0][0], dict) else None
+        cache.put('ai_column_descriptions', schema, table, ai_columns)
+        
+        if 'columns' in results:
+            if isinstance(results['columns'], Exception):
+                # Leave the table to the synchronous path, which reports the error in context
+                logger.warning(f"Could not describe {schema}.{table}: {results['columns']}")
+                return
+            columns = connector._parse_describe_rows(results['columns'])
+            cache.put('columns', schema, table, columns)
+        
+        if 'column_comments' in results:
+            column_comments = connector._parse_column_comments(results['column_comments'] or [])
+            cache.put('column_comments', schema, table, column_comments)
+        
+        # Samples are only needed when neither the AI function nor comments describe every column
+        if ai_columns or cache.contains('table_sample', schema, table):
+            return
+        undocumented = [c for c in columns if c['name'] not in column_comments]
+        if not undocumented:
+            return
+        # Past the query budget the synchronous path describes columns from metadata alone, and counts the skipped queries
+        if not connector.governor.allows(PROFILE if connector.stats_mode == 'server' else SAMPLE):
+            return
+        undocumented = connector._sampled_columns(undocumented)
+        if not undocumented:
+            # Every undocumented column is described from its name, mark the table so it isn't sampled later either
+            cache.put('table_sample', schema, table, {})
+            return
+        if connector.stats_mode == 'server':
+            cache.put('table_profile', schema, table, await self._profile_table(schema, table, undocumented, semaphore))
+        else:
+            cache.put('table_sample', schema, table,
+                      await self._sample_table(schema, table, [c['name'] for c in undocumented], semaphore))
+    
+    async def _profile_table(self, schema: str, table: str, columns: List[Dict[str, str]],
+                             semaphore: asyncio.Semaphore) -> Dict[str, Dict[str, Any]]:
+        """Run the chunked aggregate profile queries of a table concurrently"""
+        connector = self.connector
+        queries = [connector._profile_sql(schema, table, chunk) for chunk in connector._column_chunks(columns)]
+        results = await asyncio.gather(
+            *(self.run_query(sql, semaphore,
+                             fetch=lambda cursor, layout=layout: connector._parse_profile_row(layout, connector._fetch_rows(cursor)[0]),
+                             phase=PROFILE, table=f"{schema}.{table}")
+              for sql, layout in queries),
+            return_exceptions=True
+        )
+        
+        profiles = {}
+        for chunk_profiles in results:
+            if isinstance(chunk_profiles, Exception):
+                # Columns without a profile are sampled by the synchronous path instead
+                logger.warning(f"Error profiling columns of {schema}.{table}: {chunk_profiles}")
+            else:
+                profiles.update(chunk_profiles)
+        return profiles
+    
+    async def _sample_table(self, schema: str, table: str, columns: List[str],
+                            semaphore: asyncio.Semaphore) -> Dict[str, List[Any]]:
+        """Run the chunked sample queries of a table concurrently"""
+        connector = self.connector
+        chunks = connector._column_chunks(columns)
+        results = await asyncio.gather(
+            *(self.run_query(connector._sample_sql(schema, table, chunk), semaphore,
+                             fetch=lambda cursor, chunk=chunk: connector._fetch_sample_columns(cursor, chunk),
+                             phase=SAMPLE, table=f"{schema}.{table}")
+              for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        samples = {}
+        loop = asyncio.get_running_loop()
+        for chunk, chunk_samples in zip(chunks, results):
+            if isinstance(chunk_samples, QueryBudgetExceeded):
+                # Leave these columns unsampled, the budget is spent
+                continue
+            if isinstance(chunk_samples, Exception):
+                logger.warning(f"Error sampling {len(chunk)} columns of {schema}.{table}, falling back to per-column samples: {chunk_samples}")
+                for column in chunk:
+                    samples[column] = await loop.run_in_executor(None, connector.get_sample_data, schema, table, column)
+            else:
+                samples.update(chunk_samples)
+        return samples
@@ -0,0 +1,261 @@
+"""
+Backend-neutral connector interface for metadata, comments and sampling.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from connectors.governor import QueryGovernor, SAMPLE, PROFILE
+from connectors.tracing import QueryTracer
+from utils.profiler import RunProfiler, METADATA_FETCH, SAMPLING, NLP_ANALYSIS
+from utils.description_generator import DescriptionGenerator
+from utils.metadata_cache import MetadataCache
+
+logger = logging.getLogger(__name__)
+
+# How column statistics are gathered: pull row samples, or aggregate over the whole table in the backend
+STATS_MODES = ('sample', 'server')
+
+@dataclass(frozen=True)
+class TableInfo:
+    """Table metadata as reported by the backend's table listing"""
+    name: str
+    comment: Optional[str] = None
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    last_altered: Optional[Any] = None
+    kind: Optional[str] = None
+
+class MetadataConnector(ABC):
+    """Interface DbtYamlGenerator works against; backends supply metadata, comments and samples"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize with connection parameters"""
+        self.config = config
+        self.conn = None
+        self.description_generator = DescriptionGenerator()
+        # Run-scoped memo so repeated lookups for the same table don't re-query the backend
+        self.cache = MetadataCache()
+        # Optional pool and async executor, only some backends support them
+        self.pool = None
+        self.async_executor = None
+        # 'sample' pulls rows and analyzes them locally, 'server' profiles whole tables in the backend
+        self.stats_mode = 'sample'
+        # Concurrency limit and query budget shared by every query of the run
+        self.governor = QueryGovernor()
+        # Per-query timings for the slowest-statement summary and trace export
+        self.tracer = QueryTracer()
+        # Phase timings for --profile, disabled unless replaced by an enabled profiler
+        self.profiler = RunProfiler()
+    
+    @abstractmethod
+    def connect(self) -> Any:
+        """Open the connection to the backend"""
+    
+    @abstractmethod
+    def close(self) -> None:
+        """Close the connection to the backend"""
+    
+    @abstractmethod
+    def get_databases(self) -> List[str]:
+        """Get list of databases"""
+    
+    @abstractmethod
+    def get_schemas(self, database: Optional[str] = None) -> List[str]:
+        """Get list of schemas in the given database, or the connection's database"""
+    
+    @abstractmethod
+    def get_tables(self, schema: str) -> List[TableInfo]:
+        """Get list of tables in a schema"""
+    
+    @abstractmethod
+    def get_columns(self, schema: str, table: str) -> List[Dict[str, str]]:
+        """Get column information (name, type, nullable) for a table"""
+    
+    @abstractmethod
+    def get_sample_data(self, schema: str, table: str, column: str, sample_size: int = 100) -> List[Any]:
+        """Get sample non-null values from a column"""
+    
+    @abstractmethod
+    def get_table_sample(self, schema: str, table: str, columns: List[str], sample_size: int = 100) -> Dict[str, List[Any]]:
+        """Get sample non-null values for many columns of a table, keyed by column"""
+    
+    def create_pool(self, size: int) -> Any:
+        """Prepare connections for worker threads; backends without a pool share one connection"""
+        logger.info(f"{type(self).__name__} does not pool connections, workers share one connection")
+        return None
+    
+    def enable_async(self, max_in_flight: int) -> Any:
+        """Enable async query prefetching; backends without async submission run queries synchronously"""
+        logger.warning(f"{type(self).__name__} does not support async queries, running them synchronously")
+        return None
+    
+    @contextmanager
+    def borrow_connection(self) -> Iterator[Any]:
+        """Bind a connection to the calling thread for the duration of the block"""
+        yield self.conn
+    
+    def get_all_columns(self, schema: str) -> Dict[str, List[Dict[str, str]]]:
+        """Get column information for every table in a schema, or an empty dict to fall back to get_columns"""
+        return {}
+    
+    def get_table_states(self, schema: str) -> Dict[str, Any]:
+        """Get the last-altered timestamp of every table in a schema, keyed by table"""
+        return {}
+    
+    def get_non_null_sample(self, schema: str, table: str, columns: List[str], sample_size: int = 100) -> Dict[str, List[Any]]:
+        """Get non-null values for sparse columns whose row sample held only NULLs, one query per column by default"""
+        return {column: self.get_sample_data(schema, table, column, sample_size) for column in columns}
+    
+    def get_table_profile(self, schema: str, table: str, columns: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """Profile whole-table column statistics in the backend; columns left out are sampled instead"""
+        return {}
+    
+    def _ai_describe_table(self, schema: str, table: str) -> Optional[str]:
+        """Get a table description from a backend AI function, if it has one"""
+        return None
+    
+    def _ai_describe_columns(self, schema: str, table: str) -> Optional[Dict[str, str]]:
+        """Get column descriptions from a backend AI function, if it has one"""
+        return None
+    
+    def _get_table_comment(self, schema: str, table: str) -> Optional[str]:
+        """Get the existing table comment, if the backend stores one"""
+        return None
+    
+    def _get_column_comments(self, schema: str, table: str) -> Dict[str, str]:
+        """Get existing column comments, if the backend stores them"""
+        return {}
+    
+    def _stats_query_count(self, column_count: int) -> int:
+        """Number of sample or profile queries needed for this many columns of a table"""
+        return 1 if column_count else 0
+    
+    def _sampled_columns(self, columns: List[Dict[str, str]], count_avoided: bool = True) -> List[Dict[str, str]]:
+        """Keep the columns whose descriptions need sampled data, counting the stats queries the others avoid"""
+        sampled = [c for c in columns if self.description_generator.needs_sample_data(c['name'], c['type'])]
+        avoided = self._stats_query_count(len(columns)) - self._stats_query_count(len(sampled))
+        if avoided and count_avoided:
+            self.governor.record_avoided(avoided)
+        return sampled
+    
+    def _profile_query(self, phase: str) -> Any:
+        """Profiler phase for a query: sampling for data scans, metadata fetch for everything else"""
+        return self.profiler.phase(SAMPLING if phase in (SAMPLE, PROFILE) else METADATA_FETCH)
+    
+    def _resample_empty_columns(self, schema: str, table: str, samples: Dict[str, Any]) -> Dict[str, Any]:
+        """Sample non-null values again for columns whose row sample held only NULLs, so sparse columns still get
+        sample-based descriptions"""
+        empty = [column for column, values in samples.items() if len(values) == 0]
+        if not empty:
+            return samples
+        if not self.governor.allows(SAMPLE):
+            self.governor.refuse(SAMPLE, self._stats_query_count(len(empty)))
+            return samples
+        samples.update(self.get_non_null_sample(schema, table, empty))
+        return samples
+    
+    def _split_sample_rows(self, columns: List[str], rows: List[Tuple]) -> Dict[str, List[Any]]:
+        """Turn sampled rows into per-column value lists, keeping only non-null values"""
+        return {
+            column: [row[index] for row in rows if row[index] is not None]
+            for index, column in enumerate(columns)
+        }
+    
+    def get_table_description(self, schema: str, table: str, columns: Optional[List[Dict[str, str]]] = None) -> str:
+        """Get a description for a table from an AI function, an existing comment or spacy"""
+        # First try with Cortex AI function if available
+        description = self.cache.get_or_load('ai_table_description', schema, table,
+                                             lambda: self._ai_describe_table(schema, table))
+        if description:
+            return description
+        
+        # Try getting existing comment from information schema
+        comment = self._get_table_comment(schema, table)
+        if comment:
+            return comment
+        
+        # If previous methods failed, generate description using spacy
+        # Get all columns to analyze table structure, unless the caller already has them
+        if columns is None:
+            columns = self.get_columns(schema, table)
+        
+        # Generate description using our NLP-based generator
+        with self.profiler.phase(NLP_ANALYSIS):
+            description = self.description_generator.generate_table_description(table, columns)
+        
+        return description
+    
+    def get_column_descriptions(self, schema: str, table: str, columns: Optional[List[Dict[str, str]]] = None) -> Dict[str, str]:
+        """Get descriptions for columns using sample data and spacy"""
+        if columns is None:
+            columns = self.get_columns(schema, table)
+        descriptions = {}
+        
+        # First try with Cortex AI function if available
+        ai_descriptions = self.cache.get_or_load('ai_column_descriptions', schema, table,
+                                                 lambda: self._ai_describe_columns(schema, table))
+        if ai_descriptions:
+            return ai_descriptions
+        
+        # Try getting existing comments from information schema
+        existing_comments = self._get_column_comments(schema, table)
+        
+        # Gather statistics for every undocumented column of the table in one pass, unless they were prefetched
+        undocumented = [c for c in columns if c['name'] not in existing_comments]
+        samples, profiles = self._get_column_stats(schema, table, undocumented)
+        
+        # Generate descriptions for the undocumented columns with our NLP-based generator, analyzing their samples in one batch
+        with self.profiler.phase(NLP_ANALYSIS):
+            generated = self.description_generator.generate_column_descriptions([
+                {'name': c['name'], 'type': c['type'], 'sample_data': samples.get(c['name'], []),
+                 'profile': profiles.get(c['name'])}
+                for c in undocumented
+            ])
+        generated = dict(zip((c['name'] for c in undocumented), generated))
+        
+        # Use the existing comment where there is one, keeping the table's column order
+        for column_info in columns:
+            column_name = column_info['name']
+            descriptions[column_name] = existing_comments[column_name] if column_name in existing_comments else generated[column_name]
+        
+        return descriptions
+    
+    def _get_column_stats(self, schema: str, table: str,
+                          columns: List[Dict[str, str]]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """Get samples or server-side profiles for columns, depending on the stats mode"""
+        if not columns:
+            return {}, {}
+        
+        # Prefetched samples (or an empty table's known-empty sample) take precedence
+        samples = self.cache.pop('table_sample', schema, table)
+        if samples is not None:
+            return self._resample_empty_columns(schema, table, samples), {}
+        
+        # A prefetched profile is already paid for, and the prefetch already counted the queries its filtering avoided
+        profiles = self.cache.pop('table_profile', schema, table)
+        
+        # Audit, identifier, date and similar columns are described from their names and types alone
+        columns = self._sampled_columns(columns, count_avoided=profiles is None)
+        if not columns:
+            return {}, {}
+        
+        if profiles is None:
+            # Once the query budget is spent, columns are described from their names and types alone
+            phase = PROFILE if self.stats_mode == 'server' else SAMPLE
+            if not self.governor.allows(phase):
+                self.governor.refuse(phase, self._stats_query_count(len(columns)))
+                return {}, {}
+            
+            if self.stats_mode != 'server':
+                return self._resample_empty_columns(schema, table, self.get_table_sample(schema, table, [c['name'] for c in columns])), {}
+            profiles = self.get_table_profile(schema, table, columns)
+        
+        # Columns whose profile query failed fall back to row samples
+        missing = [c['name'] for c in columns if c['name'] not in profiles]
+        samples = self._resample_empty_columns(schema, table, self.get_table_sample(schema, table, missing)) if missing else {}
+        return samples, profiles
+
@@ -0,0 +1,141 @@
+"""
+Capability probing for optional Snowflake features, cached per account and role.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Features that may be unavailable depending on edition, region or role grants
+AI_DESCRIBE_TABLE = 'ai_describe_table'
+AI_DESCRIBE_COLUMNS = 'ai_describe_columns'
+TABLE_COMMENTS = 'table_comments'
+COLUMN_COMMENTS = 'column_comments'
+
+DEFAULT_CAPABILITY_TTL_SECONDS = 24 * 60 * 60
+
+# Error messages meaning a feature is missing for the account or role, rather than one query failing
+UNAVAILABLE_ERRORS = ('unknown function', 'unsupported feature', 'not supported', 'insufficient privileges')
+
+def is_unavailable_error(error: Exception) -> bool:
+    """Check whether an error shows a capability is unavailable, as opposed to a timeout, network or per-table failure"""
+    message = str(error).lower()
+    return any(pattern in message for pattern in UNAVAILABLE_ERRORS)
+
+class CapabilityProbe:
+    """Remembers which optional query paths work so dead paths are skipped for the rest of the run"""
+    
+    def __init__(self, account: str, role: str, path: Optional[str] = None,
+                 ttl_seconds: int = DEFAULT_CAPABILITY_TTL_SECONDS):
+        """Initialize for an account and role, loading unexpired results from the cache file if given"""
+        self.key = f"{account}|{role}"
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._results: Dict[str, Dict[str, float]] = {}
+        # Capabilities being probed right now, so concurrent workers wait for the first probe instead of repeating it
+        self._probes: Dict[str, threading.Event] = {}
+        self._load()
+    
+    def _load(self) -> None:
+        """Read unexpired probe results for this account and role"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read capability cache {self.path}: {e}")
+            return
+        
+        now = time.time()
+        for name, result in data.get(self.key, {}).items():
+            if now - result.get('checked_at', 0) < self.ttl_seconds:
+                self._results[name] = result
+        if self._results:
+            logger.info(f"Loaded cached capabilities for {self.key}: {self.summary()}")
+    
+    def is_available(self, name: str) -> Optional[bool]:
+        """Return True or False once a capability has been probed, or None while it is unknown"""
+        with self._lock:
+            result = self._results.get(name)
+        return None if result is None else result['available']
+    
+    def try_acquire_probe(self, name: str) -> Optional[bool]:
+        """Return True if the caller should probe an unknown capability, False if it is known, None while another probe runs"""
+        with self._lock:
+            if name in self._results:
+                return False
+            if name in self._probes:
+                return None
+            self._probes[name] = threading.Event()
+            return True
+    
+    def acquire_probe(self, name: str) -> bool:
+        """Like try_acquire_probe, but wait for a probe already running instead of returning None"""
+        while True:
+            claimed = self.try_acquire_probe(name)
+            if claimed is not None:
+                return claimed
+            with self._lock:
+                event = self._probes.get(name)
+            if event is not None:
+                event.wait()
+    
+    def release_probe(self, name: str) -> None:
+        """End a probe; if it was inconclusive, one of the waiting callers probes next"""
+        with self._lock:
+            event = self._probes.pop(name, None)
+        if event is not None:
+            event.set()
+    
+    def record(self, name: str, available: bool) -> None:
+        """Record the outcome of using a capability and persist it if it changed"""
+        with self._lock:
+            result = self._results.get(name)
+            if result is not None and (result['available'] == available or result['available']):
+                # A capability that worked once stays available, a later failure is specific to that query
+                return
+            self._results[name] = {'available': available, 'checked_at': time.time()}
+        logger.info(f"Capability {name} is {'available' if available else 'unavailable'} for {self.key}")
+        self._save()
+    
+    def summary(self) -> Dict[str, bool]:
+        """Get the probed capabilities and whether each one is available"""
+        with self._lock:
+            return {name: result['available'] for name, result in self._results.items()}
+    
+    def _save(self) -> None:
+        """Merge this account and role's results into the cache file"""
+        if not self.path:
+            return
+        
+        with self._file_lock:
+            self._write_file()
+    
+    def _write_file(self) -> None:
+        """Rewrite the cache file, keeping entries for other accounts and roles"""
+        try:
+            data = {}
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+            with self._lock:
+                data[self.key] = dict(self._results)
+            
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not write capability cache {self.path}: {e}")
@@ -0,0 +1,178 @@
+"""
+Query governor that limits concurrency, enforces a run budget and tags queries for cost attribution.
+"""
+
+import json
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Query phases, used in the query tag and to decide what still runs once the budget is spent
+METADATA = 'metadata'
+COMMENTS = 'comments'
+AI = 'ai'
+SAMPLE = 'sample'
+PROFILE = 'profile'
+
+# Phases that scan table data or call Cortex AI; they stop once the budget is exhausted
+BUDGETED_PHASES = (AI, SAMPLE, PROFILE)
+
+def _sql_string(value: str) -> str:
+    """Escape a value for a single-quoted Snowflake string literal, where backslash is also an escape character"""
+    return value.replace('\\', '\\\\').replace("'", "''")
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a budgeted query is attempted after the run's query budget is spent"""
+
+class QueryGovernor:
+    """Caps concurrent queries, tracks the run's query budget and keeps each session's QUERY_TAG current"""
+    
+    def __init__(self, run_id: Optional[str] = None, max_concurrent: int = 0, max_queries: int = 0,
+                 max_query_seconds: float = 0, statement_timeout: int = 0):
+        """Initialize the limits, where 0 means unlimited, and the run id used in query tags"""
+        self.run_id = run_id or f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.max_concurrent = max_concurrent
+        self.max_queries = max_queries
+        self.max_query_seconds = max_query_seconds
+        self.statement_timeout = statement_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+        self._lock = threading.Lock()
+        # Per connection: a lock serializing tag changes with submissions, and the tag the session currently has
+        self._sessions: Dict[int, Dict[str, Any]] = {}
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.tag_changes = 0
+        self.refused = 0
+        self.avoided = 0
+        self.exhausted = False
+    
+    def session_parameters(self) -> Dict[str, Any]:
+        """Get the session parameters new connections should be opened with"""
+        parameters = {'QUERY_TAG': self.query_tag(METADATA)}
+        if self.statement_timeout > 0:
+            parameters['STATEMENT_TIMEOUT_IN_SECONDS'] = self.statement_timeout
+        return parameters
+    
+    def register(self, conn: Any) -> None:
+        """Remember that a connection opened with session_parameters is already tagged for the metadata phase"""
+        self._session(conn)['tag'] = self.query_tag(METADATA)
+    
+    def query_tag(self, phase: str) -> str:
+        """Build the QUERY_TAG identifying this run and phase"""
+        return json.dumps({'app': 'dbt_yaml_generator', 'run_id': self.run_id, 'phase': phase})
+    
+    def allows(self, phase: str) -> bool:
+        """Check whether a query of this phase may still run under the budget; callers that skip queries count them with refuse"""
+        if phase not in BUDGETED_PHASES:
+            # Metadata is always fetched so every table still gets a name- and type-based description
+            return True
+        
+        with self._lock:
+            if not self.exhausted and ((self.max_queries and self.queries >= self.max_queries) or
+                                       (self.max_query_seconds and self.query_seconds >= self.max_query_seconds)):
+                self.exhausted = True
+                logger.warning(f"Query budget exhausted after {self.queries} queries and {self.query_seconds:.1f}s, "
+                               f"remaining tables get metadata-only descriptions")
+            return not self.exhausted
+    
+    def refuse(self, phase: str, count: int = 1) -> None:
+        """Count queries of a budgeted phase skipped because the budget is spent"""
+        if phase in BUDGETED_PHASES and count > 0:
+            with self._lock:
+                self.refused += count
+    
+    def try_acquire(self, phase: str) -> bool:
+        """Take a concurrency slot without waiting; raise QueryBudgetExceeded if the phase is out of budget"""
+        if not self.allows(phase):
+            self.refuse(phase)
+            raise QueryBudgetExceeded(f"Query budget exhausted, skipping {phase} query")
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            return False
+        with self._lock:
+            self.queries += 1
+        return True
+    
+    def acquire(self, phase: str) -> None:
+        """Wait for a concurrency slot; raise QueryBudgetExceeded if the phase is out of budget"""
+        if not self.allows(phase):
+            self.refuse(phase)
+            raise QueryBudgetExceeded(f"Query budget exhausted, skipping {phase} query")
+        if self._slots is not None:
+            self._slots.acquire()
+        with self._lock:
+            self.queries += 1
+    
+    def release(self, elapsed: float) -> None:
+        """Give back a concurrency slot and charge the query's elapsed time to the budget"""
+        with self._lock:
+            self.query_seconds += elapsed
+        if self._slots is not None:
+            self._slots.release()
+    
+    @contextmanager
+    def tagged(self, conn: Any, phase: str, tracer: Optional[Any] = None) -> Iterator[None]:
+        """Hold the connection's session for a submission, switching its QUERY_TAG first if the phase changed;
+        the switch is a round trip of its own, so it is counted as a query and recorded in the tracer"""
+        session = self._session(conn)
+        with session['lock']:
+            tag = self.query_tag(phase)
+            if session['tag'] != tag:
+                sql = f"ALTER SESSION SET QUERY_TAG = '{_sql_string(tag)}'"
+                cursor = conn.cursor()
+                start = time.perf_counter()
+                error = None
+                try:
+                    cursor.execute(sql)
+                    session['tag'] = tag
+                except Exception as e:
+                    # A missing tag only affects cost attribution, never the generated YAML
+                    logger.warning(f"Could not set QUERY_TAG for phase {phase}: {e}")
+                    error = e
+                finally:
+                    cursor.close()
+                    with self._lock:
+                        self.queries += 1
+                        self.tag_changes += 1
+                        self.query_seconds += time.perf_counter() - start
+                    if tracer is not None:
+                        tracer.add(sql, phase, None, start, error=error)
+            yield
+    
+    @contextmanager
+    def query(self, conn: Any, phase: str, tracer: Optional[Any] = None) -> Iterator[None]:
+        """Run one query of a phase on a connection within the concurrency limit and budget"""
+        self.acquire(phase)
+        start = time.perf_counter()
+        try:
+            with self.tagged(conn, phase, tracer):
+                yield
+        finally:
+            self.release(time.perf_counter() - start)
+    
+    def record_avoided(self, count: int) -> None:
+        """Count queries that were never needed, such as samples of columns described from their names alone"""
+        with self._lock:
+            self.avoided += count
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get the number of queries run (query tag switches included), their total time and how many budgeted
+        queries were skipped or avoided"""
+        with self._lock:
+            return {
+                'queries': self.queries,
+                'query_seconds': self.query_seconds,
+                'tag_changes': self.tag_changes,
+                'refused': self.refused,
+                'avoided': self.avoided,
+                'exhausted': self.exhausted
+            }
+    
+    def _session(self, conn: Any) -> Dict[str, Any]:
+        """Get the tracked session state of a connection"""
+        with self._lock:
+            return self._sessions.setdefault(id(conn), {'lock': threading.Lock(), 'tag': None})
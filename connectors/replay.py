@@ -0,0 +1,336 @@
+"""
+Record and replay Snowflake query results for deterministic offline benchmarking.
+"""
+
+import json
+import math
+import time
+import uuid
+import heapq
+import random
+import logging
+import datetime
+import threading
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the recording layout changes so old recordings are rejected instead of misread
+RECORDING_FORMAT_VERSION = 1
+
+# Connection settings stored with a recording so replays need no Snowflake credentials
+RECORDED_CONFIG_KEYS = ('account', 'database', 'schema', 'warehouse', 'role')
+
+def _normalize_sql(sql: str) -> str:
+    """Collapse whitespace so formatting differences don't change a query's key"""
+    return ' '.join(sql.split())
+
+def _encode_value(value: Any) -> Any:
+    """Convert result values JSON can't hold into tagged objects"""
+    if isinstance(value, Decimal):
+        return {'__decimal__': str(value)}
+    if isinstance(value, datetime.datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {'__time__': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__bytes__': value.hex()}
+    return str(value)
+
+def _decode_value(value: Dict[str, Any]) -> Any:
+    """Turn tagged objects written by _encode_value back into result values"""
+    if '__decimal__' in value:
+        return Decimal(value['__decimal__'])
+    if '__datetime__' in value:
+        return datetime.datetime.fromisoformat(value['__datetime__'])
+    if '__date__' in value:
+        return datetime.date.fromisoformat(value['__date__'])
+    if '__time__' in value:
+        return datetime.time.fromisoformat(value['__time__'])
+    if '__bytes__' in value:
+        return bytes.fromhex(value['__bytes__'])
+    return value
+
+class QueryRecorder:
+    """Appends every query, its result or error and its elapsed time to a JSONL recording"""
+    
+    def __init__(self, path: str, config: Dict[str, Any], capabilities: Optional[Dict[str, bool]] = None):
+        """Start a new recording, storing the non-secret connection settings and the capabilities known
+        from the capability cache in its header"""
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'w')
+        self.recorded = 0
+        self._write({
+            'version': RECORDING_FORMAT_VERSION,
+            'config': {key: config.get(key) for key in RECORDED_CONFIG_KEYS},
+            # Cached capabilities are not probed, so their probe queries are missing from the recording
+            'capabilities': dict(capabilities or {})
+        })
+    
+    def wrap(self, conn: Any) -> 'RecordingConnection':
+        """Wrap a Snowflake connection so its queries are recorded"""
+        return RecordingConnection(conn, self)
+    
+    def record(self, sql: str, rows: Optional[List[Tuple]], description: Optional[List[Tuple]],
+               elapsed: float, error: Optional[Exception] = None) -> None:
+        """Write one query and its outcome"""
+        self._write({
+            'sql': _normalize_sql(sql),
+            'columns': [d[0] for d in description] if description else None,
+            'rows': [list(row) for row in rows] if rows is not None else None,
+            'error': str(error) if error is not None else None,
+            'elapsed': elapsed
+        })
+        with self._lock:
+            self.recorded += 1
+    
+    def _write(self, entry: Dict[str, Any]) -> None:
+        """Append one line to the recording"""
+        line = json.dumps(entry, default=_encode_value)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+    
+    def close(self) -> None:
+        """Close the recording file"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        logger.info(f"Recorded {self.recorded} queries to {self.path}")
+
+class RecordingConnection:
+    """Snowflake connection proxy that records the queries run through its cursors"""
+    
+    def __init__(self, conn: Any, recorder: QueryRecorder):
+        """Wrap a real connection"""
+        self._conn = conn
+        self._recorder = recorder
+        # Async submissions by query id: (sql, submit time), until their results are fetched
+        self._submitted: Dict[str, Tuple[str, float]] = {}
+    
+    def cursor(self) -> 'RecordingCursor':
+        """Open a recording cursor"""
+        return RecordingCursor(self._conn.cursor(), self)
+    
+    def get_query_status_throw_if_error(self, query_id: str) -> Any:
+        """Check an async query's status, recording the error if it failed"""
+        try:
+            return self._conn.get_query_status_throw_if_error(query_id)
+        except Exception as e:
+            sql, start = self._submitted.pop(query_id, (None, 0.0))
+            if sql is not None:
+                self._recorder.record(sql, None, None, time.perf_counter() - start, error=e)
+            raise
+    
+    def __getattr__(self, name: str) -> Any:
+        """Pass everything else through to the real connection"""
+        return getattr(self._conn, name)
+
+class RecordingCursor:
+    """Cursor proxy that fetches each result once, records it and serves it to the caller"""
+    
+    def __init__(self, cursor: Any, connection: RecordingConnection):
+        """Wrap a real cursor"""
+        self._cursor = cursor
+        self._connection = connection
+        self._rows: List[Tuple] = []
+        self.description = None
+    
+    @property
+    def sfqid(self) -> Optional[str]:
+        """Query id of the last query"""
+        return self._cursor.sfqid
+    
+    def execute(self, sql: str, *args: Any, **kwargs: Any) -> 'RecordingCursor':
+        """Run a query and record its full result"""
+        start = time.perf_counter()
+        try:
+            self._cursor.execute(sql, *args, **kwargs)
+            self._rows = self._cursor.fetchall()
+        except Exception as e:
+            self._connection._recorder.record(sql, None, None, time.perf_counter() - start, error=e)
+            raise
+        self.description = self._cursor.description
+        self._connection._recorder.record(sql, self._rows, self.description, time.perf_counter() - start)
+        return self
+    
+    def execute_async(self, sql: str, *args: Any, **kwargs: Any) -> Any:
+        """Submit a query asynchronously; it is recorded when its results are fetched"""
+        result = self._cursor.execute_async(sql, *args, **kwargs)
+        self._connection._submitted[self._cursor.sfqid] = (sql, time.perf_counter())
+        return result
+    
+    def get_results_from_sfqid(self, query_id: str) -> None:
+        """Fetch an async query's results and record them"""
+        self._cursor.get_results_from_sfqid(query_id)
+        self._rows = self._cursor.fetchall()
+        self.description = self._cursor.description
+        sql, start = self._connection._submitted.pop(query_id, ('', time.perf_counter()))
+        self._connection._recorder.record(sql, self._rows, self.description, time.perf_counter() - start)
+    
+    def fetchall(self) -> List[Tuple]:
+        """Return the rows of the last query"""
+        return list(self._rows)
+    
+    def fetchone(self) -> Optional[Tuple]:
+        """Return the first row of the last query"""
+        return self._rows[0] if self._rows else None
+    
+    def close(self) -> None:
+        """Close the real cursor"""
+        self._cursor.close()
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[Dict[str, Any]], float]:
+    """Parse a latency distribution: 'recorded', 'fixed:S', 'uniform:MIN,MAX' or 'lognormal:MEDIAN,SIGMA' (seconds)"""
+    kind, _, args = spec.partition(':')
+    values = [float(value) for value in args.split(',')] if args else []
+    if kind == 'recorded' and not values:
+        return lambda entry: entry.get('elapsed', 0.0)
+    if kind == 'fixed' and len(values) == 1:
+        return lambda entry: values[0]
+    if kind == 'uniform' and len(values) == 2:
+        return lambda entry: rng.uniform(values[0], values[1])
+    if kind == 'lognormal' and len(values) == 2:
+        return lambda entry: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Invalid replay latency '{spec}', expected recorded, fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA")
+
+class ReplayError(Exception):
+    """A recorded query error, or a query that is not in the recording"""
+
+class QueryReplay:
+    """Serves recorded results with simulated latency on a warehouse with a limited number of query slots"""
+    
+    def __init__(self, path: str, latency: str = 'recorded', concurrency: int = 0, seed: int = 0):
+        """Load a recording; concurrency 0 lets every query run at once"""
+        self.path = path
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._latency = parse_latency(latency, self._rng)
+        # Free times of the simulated warehouse's query slots
+        self._slots: List[float] = [0.0] * concurrency
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._served: Dict[str, int] = {}
+        self.misses = 0
+        
+        with open(path, 'r') as f:
+            header = json.loads(f.readline())
+            if header.get('version') != RECORDING_FORMAT_VERSION:
+                raise ValueError(f"Recording {path} was written by an incompatible version")
+            self.config = header.get('config', {})
+            self.capabilities: Dict[str, bool] = header.get('capabilities', {})
+            for line in f:
+                entry = json.loads(line, object_hook=_decode_value)
+                self._entries.setdefault(entry['sql'], []).append(entry)
+        logger.info(f"Loaded {sum(len(entries) for entries in self._entries.values())} recorded queries from {path}")
+    
+    def connect(self) -> 'ReplayConnection':
+        """Open a replay connection"""
+        return ReplayConnection(self)
+    
+    def lookup(self, sql: str) -> Dict[str, Any]:
+        """Get the recorded outcome of a query; repeats of a query are served in recorded order"""
+        key = _normalize_sql(sql)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                raise ReplayError(f"Query not in recording: {key[:200]}")
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+        return entries[min(index, len(entries) - 1)]
+    
+    def schedule(self, entry: Dict[str, Any]) -> float:
+        """Queue a query on the simulated warehouse and return the time it finishes"""
+        with self._lock:
+            latency = max(0.0, self._latency(entry))
+            now = time.monotonic()
+            if not self._slots:
+                return now + latency
+            start = max(now, heapq.heappop(self._slots))
+            heapq.heappush(self._slots, start + latency)
+            return start + latency
+
+class ReplayConnection:
+    """Stand-in for a Snowflake connection that answers from a recording"""
+    
+    def __init__(self, replay: QueryReplay):
+        """Initialize with the loaded recording"""
+        self.replay = replay
+        # Async queries by id: (recorded entry, finish time)
+        self._async: Dict[str, Tuple[Dict[str, Any], float]] = {}
+    
+    def cursor(self) -> 'ReplayCursor':
+        """Open a replay cursor"""
+        return ReplayCursor(self)
+    
+    def get_query_status_throw_if_error(self, query_id: str) -> str:
+        """Report an async query as running until its simulated finish time, then raise its recorded error"""
+        entry, finish = self._async[query_id]
+        if time.monotonic() < finish:
+            return 'RUNNING'
+        if entry['error']:
+            raise ReplayError(entry['error'])
+        return 'SUCCESS'
+    
+    def is_still_running(self, status: str) -> bool:
+        """Check a status returned by get_query_status_throw_if_error"""
+        return status == 'RUNNING'
+    
+    def close(self) -> None:
+        """Nothing to close"""
+
+class ReplayCursor:
+    """Cursor that serves recorded rows after the simulated query time"""
+    
+    def __init__(self, connection: ReplayConnection):
+        """Initialize for a replay connection"""
+        self.connection = connection
+        self.description = None
+        self.sfqid = None
+        self._rows: List[Tuple] = []
+    
+    def execute(self, sql: str, *args: Any, **kwargs: Any) -> 'ReplayCursor':
+        """Wait out the simulated latency, then load the recorded result or raise the recorded error"""
+        if _normalize_sql(sql).upper().startswith('ALTER SESSION'):
+            # Session settings such as the run-specific QUERY_TAG differ between runs
+            return self
+        entry = self.connection.replay.lookup(sql)
+        delay = self.connection.replay.schedule(entry) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._load(entry)
+        return self
+    
+    def execute_async(self, sql: str, *args: Any, **kwargs: Any) -> Dict[str, str]:
+        """Submit a query that finishes after its simulated latency"""
+        entry = self.connection.replay.lookup(sql)
+        self.sfqid = str(uuid.uuid4())
+        self.connection._async[self.sfqid] = (entry, self.connection.replay.schedule(entry))
+        return {'queryId': self.sfqid}
+    
+    def get_results_from_sfqid(self, query_id: str) -> None:
+        """Load the recorded result of a finished async query"""
+        entry, _ = self.connection._async.pop(query_id)
+        self._load(entry)
+    
+    def _load(self, entry: Dict[str, Any]) -> None:
+        """Make a recorded entry the current result"""
+        if entry['error']:
+            raise ReplayError(entry['error'])
+        self._rows = [tuple(row) for row in entry['rows'] or []]
+        self.description = [(name,) for name in entry['columns']] if entry['columns'] else None
+    
+    def fetchall(self) -> List[Tuple]:
+        """Return the recorded rows"""
+        return list(self._rows)
+    
+    def fetchone(self) -> Optional[Tuple]:
+        """Return the first recorded row"""
+        return self._rows[0] if self._rows else None
+    
+    def close(self) -> None:
+        """Nothing to close"""
@@ -4,24 +4,125 @@ Snowflake connector implementation with multiple authentication methods.
 
 import os
 import re
+import json
+import queue
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
 import snowflake.connector
 from dotenv import load_dotenv
 
-from utils.description_generator import DescriptionGenerator
+try:
+    import pyarrow
+except ImportError:
+    # Arrow fetching is optional, install snowflake-connector-python[pandas] to enable it
+    pyarrow = None
+
+from connectors.async_executor import AsyncQueryExecutor
+from connectors.base import MetadataConnector, TableInfo
+from connectors.capabilities import (
+    CapabilityProbe,
+    is_unavailable_error,
+    AI_DESCRIBE_TABLE,
+    AI_DESCRIBE_COLUMNS,
+    TABLE_COMMENTS,
+    COLUMN_COMMENTS,
+    DEFAULT_CAPABILITY_TTL_SECONDS
+)
+from connectors.governor import QueryBudgetExceeded, METADATA, COMMENTS, AI, SAMPLE, PROFILE
 
 logger = logging.getLogger(__name__)
 
-class SnowflakeConnector:
+def _resolve_identifier(name: str) -> str:
+    """Resolve an identifier to the name Snowflake stores: unquoted names are upper-cased, quoted ones kept as written"""
+    if len(name) >= 2 and name.startswith('"') and name.endswith('"'):
+        return name[1:-1].replace('""', '"')
+    return name.upper()
+
+def _sql_string(value: str) -> str:
+    """Escape a value for use inside a single-quoted SQL string literal"""
+    return value.replace("'", "''")
+
+# Maximum number of columns pulled by a single table sample query; wider tables are split into chunks
+SAMPLE_COLUMN_CHUNK_SIZE = 100
+
+# Number of most frequent values returned per column by server-side profiling
+PROFILE_TOP_K = 5
+
+class SnowflakeConnectionPool:
+    """Bounded pool of Snowflake connections shared by worker threads"""
+    
+    def __init__(self, factory: Callable[[], Any], max_size: int, initial: Optional[List[Any]] = None):
+        """Initialize with a connection factory, the maximum pool size and any already-open connections"""
+        self._factory = factory
+        self._max_size = max(1, max_size)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._connections = list(initial or [])
+        self._size = len(self._connections)
+        for conn in self._connections:
+            self._idle.put(conn)
+    
+    def acquire(self) -> Any:
+        """Borrow a connection, opening a new one while the pool is below its maximum size"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            can_open = self._size < self._max_size
+            if can_open:
+                # Reserve the slot before connecting so concurrent callers can't overshoot the limit
+                self._size += 1
+        
+        if not can_open:
+            # Pool is at capacity, wait for another worker to give a connection back
+            return self._idle.get()
+        
+        try:
+            conn = self._factory()
+        except Exception:
+            with self._lock:
+                self._size -= 1
+            raise
+        with self._lock:
+            self._connections.append(conn)
+        logger.info(f"Opened pooled Snowflake connection {len(self._connections)}/{self._max_size}")
+        return conn
+    
+    def release(self, conn: Any) -> None:
+        """Return a borrowed connection to the pool"""
+        self._idle.put(conn)
+    
+    def close_all(self, keep: Optional[Any] = None) -> None:
+        """Close every pooled connection except the one passed as keep"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._size = 0
+        for conn in connections:
+            if conn is not keep:
+                conn.close()
+
+class SnowflakeConnector(MetadataConnector):
     """Connector implementation for Snowflake with support for multiple authentication methods"""
     
-    def __init__(self, config: Dict[str, str]):
-        """Initialize with connection parameters"""
+    def __init__(self, config: Dict[str, str], capability_cache_path: Optional[str] = None,
+                 capability_ttl_seconds: int = DEFAULT_CAPABILITY_TTL_SECONDS):
+        """Initialize with connection parameters and an optional file for caching capability probes"""
         # Process the configuration to replace environment variables
-        self.config = self._process_env_variables(config)
-        self.conn = None
-        self.description_generator = DescriptionGenerator()
+        super().__init__(self._process_env_variables(config))
+        # Connections bound to worker threads borrowing from the pool
+        self._local = threading.local()
+        # Fetch samples and bulk metadata as Arrow tables instead of Python row tuples when possible
+        self.use_arrow = pyarrow is not None
+        # Optional recording of every query and result, or a recording to answer queries from instead of Snowflake
+        self.recorder = None
+        self.replay = None
+        # Which optional features (Cortex AI functions, comment queries) work for this account and role
+        self.capabilities = CapabilityProbe(self.config.get('account'), self.config.get('role', 'ACCOUNTADMIN'),
+                                            capability_cache_path, capability_ttl_seconds)
     
     def _process_env_variables(self, config: Dict[str, str]) -> Dict[str, str]:
         """Replace environment variable placeholders in config values"""
@@ -64,6 +165,18 @@ class SnowflakeConnector:
     
     def connect(self) -> Any:
         """Connect to Snowflake database with support for different authentication methods"""
+        self.conn = self._open_connection()
+        logger.info(f"Connected to Snowflake database: {self.config.get('database')}")
+        return self.conn
+    
+    def _open_connection(self) -> Any:
+        """Open a new Snowflake connection using the configured authentication method"""
+        if self.replay:
+            # Replayed runs answer from the recording and need no credentials
+            conn = self.replay.connect()
+            self.governor.register(conn)
+            return conn
+        
         # Extract authentication config
         auth_config = self.config.get('authentication', {})
         auth_method = auth_config.get('method', 'password')
@@ -125,159 +238,440 @@ class SnowflakeConnector:
         safe_params = {k: v for k, v in conn_params.items() if k not in ['password', 'token']}
         logger.info(f"Connecting to Snowflake with parameters: {safe_params}")
         
+        # Open the session with the run's query tag and statement timeout already set
+        conn_params['session_parameters'] = self.governor.session_parameters()
+        
         # Connect to Snowflake
-        self.conn = snowflake.connector.connect(**conn_params)
-        logger.info(f"Connected to Snowflake database: {self.config.get('database')}")
-        return self.conn
+        conn = snowflake.connector.connect(**conn_params)
+        if self.recorder:
+            conn = self.recorder.wrap(conn)
+        self.governor.register(conn)
+        return conn
+    
+    def create_pool(self, size: int) -> SnowflakeConnectionPool:
+        """Create a connection pool for worker threads, reusing the main connection as its first member"""
+        self.pool = SnowflakeConnectionPool(self._open_connection, size, initial=[self.conn])
+        return self.pool
+    
+    def enable_async(self, max_in_flight: int) -> AsyncQueryExecutor:
+        """Prefetch metadata and sample queries with async query submission, at most max_in_flight at once"""
+        self.async_executor = AsyncQueryExecutor(self, max_in_flight=max_in_flight)
+        return self.async_executor
     
-    def get_schemas(self) -> List[str]:
-        """Get list of schemas in the database"""
-        cursor = self.conn.cursor()
+    @contextmanager
+    def borrow_connection(self) -> Iterator[Any]:
+        """Bind a pooled connection to the calling thread for the duration of the block"""
+        if self.pool is None:
+            yield self.conn
+            return
+        
+        conn = self.pool.acquire()
+        self._local.conn = conn
         try:
-            cursor.execute("SHOW SCHEMAS")
-            schemas = [row[1] for row in cursor.fetchall()]
-            return schemas
+            yield conn
         finally:
-            cursor.close()
+            self._local.conn = None
+            self.pool.release(conn)
+    
+    def _connection(self) -> Any:
+        """Get the connection bound to the calling thread, or the main connection"""
+        return getattr(self._local, 'conn', None) or self.conn
     
-    def get_tables(self, schema: str) -> List[str]:
-        """Get list of tables in a schema"""
-        cursor = self.conn.cursor()
+    def _run_query(self, sql: str, phase: str, table: Optional[str] = None,
+                   fetch: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Run one query through the governor and the tracer, returning fetch(cursor) or all rows"""
+        conn = self._connection()
+        cursor = conn.cursor()
         try:
-            cursor.execute(f"SHOW TABLES IN SCHEMA {schema}")
-            tables = [row[1] for row in cursor.fetchall()]
-            return tables
+            # The governor limits concurrency, charges the budget and tags the session; the tracer times execute and fetch
+            with self._profile_query(phase), self.governor.query(conn, phase, self.tracer), self.tracer.span(sql, phase, table) as span:
+                cursor.execute(sql)
+                result = fetch(cursor) if fetch else cursor.fetchall()
+                span.set_result(result, getattr(cursor, 'rowcount', None))
+            return result
         finally:
             cursor.close()
     
+    def get_databases(self) -> List[str]:
+        """Get list of databases visible to the current role"""
+        return [row[1] for row in self._run_query("SHOW DATABASES", METADATA)]
+    
+    def get_schemas(self, database: Optional[str] = None) -> List[str]:
+        """Get list of schemas in the given database, or the connection's database"""
+        return [row[1] for row in self._run_query(f"SHOW SCHEMAS IN DATABASE {database}" if database else "SHOW SCHEMAS", METADATA)]
+    
+    def _information_schema(self, schema: str) -> Tuple[str, str]:
+        """Get the information schema to query and the schema name as stored, quoted for a SQL string literal,
+        for a possibly database-qualified schema"""
+        if '.' in schema:
+            database, schema_name = schema.split('.', 1)
+            return f"{database}.information_schema", _sql_string(_resolve_identifier(schema_name))
+        return "information_schema", _sql_string(_resolve_identifier(schema))
+    
+    def get_tables(self, schema: str) -> List[TableInfo]:
+        """Get list of tables in a schema with the metadata SHOW TABLES already returns"""
+        rows, description = self._run_query(f"SHOW TABLES IN SCHEMA {schema}", METADATA,
+                                            fetch=lambda cursor: (cursor.fetchall(), cursor.description))
+        # Read fields by column name, the SHOW TABLES layout differs between Snowflake releases
+        field_names = [d[0].lower() for d in description or []]
+        tables = []
+        for row in rows:
+            fields = dict(zip(field_names, row))
+            table = TableInfo(
+                name=fields.get('name', row[1]),
+                comment=fields.get('comment') or None,
+                rows=fields.get('rows'),
+                bytes=fields.get('bytes'),
+                last_altered=fields.get('last_altered'),
+                kind=fields.get('kind')
+            )
+            tables.append(table)
+            
+            # Seed the run cache so descriptions don't query information_schema.tables per table
+            self.cache.put('table_comment', schema, table.name, table.comment)
+            if table.rows == 0:
+                # Nothing to sample in an empty table
+                self.cache.put('table_sample', schema, table.name, {})
+        return tables
+    
     def get_columns(self, schema: str, table: str) -> List[Dict[str, str]]:
         """Get column information for a table"""
-        cursor = self.conn.cursor()
+        return self.cache.get_or_load('columns', schema, table, lambda: self._describe_table(schema, table))
+    
+    def _describe_table(self, schema: str, table: str) -> List[Dict[str, str]]:
+        """Run DESCRIBE TABLE to get column information for a table"""
+        return self._parse_describe_rows(self._run_query(f"DESCRIBE TABLE {schema}.{table}", METADATA, f"{schema}.{table}"))
+    
+    def _parse_describe_rows(self, rows: List[Tuple]) -> List[Dict[str, str]]:
+        """Convert DESCRIBE TABLE output into column information dictionaries"""
+        columns = []
+        for row in rows:
+            column_info = {
+                'name': row[0],
+                'type': row[1],
+                'nullable': row[3]
+            }
+            columns.append(column_info)
+        return columns
+    
+    def get_all_columns(self, schema: str) -> Dict[str, List[Dict[str, str]]]:
+        """Get column information for every table in a schema with a single query, keyed by table"""
         try:
-            cursor.execute(f"DESCRIBE TABLE {schema}.{table}")
-            columns = []
-            for row in cursor.fetchall():
+            information_schema, schema_name = self._information_schema(schema)
+            sql = f"""
+            SELECT table_name, column_name, data_type, is_nullable, comment,
+                   character_maximum_length, numeric_precision, numeric_scale, datetime_precision
+            FROM {information_schema}.columns
+            WHERE table_schema = '{schema_name}'
+            ORDER BY table_name, ordinal_position
+            """
+            columns_by_table = {}
+            for row in self._run_query(sql, METADATA, fetch=self._fetch_rows):
                 column_info = {
-                    'name': row[0],
-                    'type': row[1],
-                    'nullable': row[3]
+                    'name': row[1],
+                    'type': self._format_column_type(row[2], row[5], row[6], row[7], row[8]),
+                    # Match the Y/N convention used by DESCRIBE TABLE
+                    'nullable': 'Y' if row[3] == 'YES' else 'N',
+                    'comment': row[4]
                 }
-                columns.append(column_info)
-            return columns
-        finally:
-            cursor.close()
+                columns_by_table.setdefault(row[0], []).append(column_info)
+            
+            # Seed the run cache so later per-table lookups don't go back to Snowflake
+            for table, columns in columns_by_table.items():
+                self.cache.put('columns', schema, table, columns)
+                self.cache.put('column_comments', schema, table,
+                               {c['name']: c['comment'] for c in columns if c['comment']})
+            
+            logger.info(f"Loaded column metadata for {len(columns_by_table)} tables in schema {schema}")
+            return columns_by_table
+        except Exception as e:
+            logger.warning(f"Bulk column metadata not available for schema {schema}, falling back to per-table queries: {e}")
+            return {}
+    
+    def get_table_states(self, schema: str) -> Dict[str, Any]:
+        """Get the LAST_ALTERED timestamp of every table in a schema, keyed by table"""
+        try:
+            information_schema, schema_name = self._information_schema(schema)
+            rows = self._run_query(f"SELECT table_name, last_altered FROM {information_schema}.tables WHERE table_schema = '{schema_name}'",
+                                   METADATA)
+            return {row[0]: row[1] for row in rows}
+        except Exception as e:
+            logger.warning(f"Table change timestamps not available for schema {schema}, all tables will be recomputed: {e}")
+            return {}
+    
+    def _format_column_type(self, data_type: str, char_length: Optional[int], precision: Optional[int],
+                            scale: Optional[int], datetime_precision: Optional[int]) -> str:
+        """Render an information_schema data type the way DESCRIBE TABLE reports it"""
+        if data_type == 'TEXT' and char_length is not None:
+            return f"VARCHAR({char_length})"
+        if data_type == 'NUMBER' and precision is not None:
+            return f"NUMBER({precision},{scale or 0})"
+        if data_type and data_type.startswith('TIMESTAMP') and datetime_precision is not None:
+            return f"{data_type}({datetime_precision})"
+        return data_type
     
     def get_sample_data(self, schema: str, table: str, column: str, sample_size: int = 100) -> List[Any]:
         """Get sample data from a column"""
-        cursor = self.conn.cursor()
         try:
             # Get non-null values for better analysis
-            cursor.execute(f"SELECT {column} FROM {schema}.{table} WHERE {column} IS NOT NULL SAMPLE ({sample_size} ROWS)")
+            rows = self._run_query(f"SELECT {column} FROM {schema}.{table} WHERE {column} IS NOT NULL SAMPLE ({sample_size} ROWS)",
+                                   SAMPLE, f"{schema}.{table}")
             # Extract values from the single-column result
-            sample_data = [row[0] for row in cursor.fetchall()]
+            sample_data = [row[0] for row in rows]
             return sample_data
         except Exception as e:
             logger.warning(f"Error getting sample data for {schema}.{table}.{column}: {e}")
             return []
-        finally:
-            cursor.close()
     
-    def get_table_description(self, schema: str, table: str) -> str:
-        """Get AI-generated description for a table using sample data and spacy"""
-        cursor = self.conn.cursor()
-        try:
-            # First try with Cortex AI function if available
-            try:
-                sql = f"SELECT AI_DESCRIBE_TABLE('{schema}.{table}')"
-                cursor.execute(sql)
-                result = cursor.fetchone()
-                if result and result[0]:
-                    return result[0]
-            except Exception as e:
-                logger.info(f"AI_DESCRIBE_TABLE function not available, using spacy-based description: {e}")
-            
-            # Try getting existing comment from information schema
+    def get_table_sample(self, schema: str, table: str, columns: List[str], sample_size: int = 100,
+                         chunk_size: int = SAMPLE_COLUMN_CHUNK_SIZE) -> Dict[str, List[Any]]:
+        """Get sample data for many columns of a table with one query per chunk of columns"""
+        samples = {}
+        chunks = self._column_chunks(columns, chunk_size)
+        for index, chunk in enumerate(chunks):
+            if not self.governor.allows(SAMPLE):
+                self.governor.refuse(SAMPLE, len(chunks) - index)
+                break
             try:
-                sql = f"SELECT COMMENT FROM information_schema.tables WHERE table_schema = '{schema}' AND table_name = '{table}'"
-                cursor.execute(sql)
-                result = cursor.fetchone()
-                if result and result[0]:
-                    return result[0]
+                # Sample whole rows once instead of scanning the table again for every column
+                samples.update(self._run_query(self._sample_sql(schema, table, chunk, sample_size), SAMPLE, f"{schema}.{table}",
+                                               fetch=lambda cursor: self._fetch_sample_columns(cursor, chunk)))
+            except QueryBudgetExceeded:
+                # The governor counted this chunk, count the ones after it
+                self.governor.refuse(SAMPLE, len(chunks) - index - 1)
+                break
             except Exception as e:
-                logger.info(f"Table comment not available: {e}")
-            
-            # If previous methods failed, generate description using spacy
-            # Get all columns to analyze table structure
-            columns = self.get_columns(schema, table)
-            
-            # Generate description using our NLP-based generator
-            description = self.description_generator.generate_table_description(table, columns)
-            
-            return description
-        finally:
-            cursor.close()
+                logger.warning(f"Error sampling {len(chunk)} columns of {schema}.{table}, falling back to per-column samples: {e}")
+                for column in chunk:
+                    samples[column] = self.get_sample_data(schema, table, column, sample_size)
+        return samples
     
-    def get_column_descriptions(self, schema: str, table: str) -> Dict[str, str]:
-        """Get descriptions for columns using sample data and spacy"""
-        cursor = self.conn.cursor()
-        try:
-            columns = self.get_columns(schema, table)
-            descriptions = {}
-            
-            # First try with Cortex AI function if available
+    def get_non_null_sample(self, schema: str, table: str, columns: List[str], sample_size: int = 100,
+                            chunk_size: int = SAMPLE_COLUMN_CHUNK_SIZE) -> Dict[str, Any]:
+        """Get non-null values for sparse columns with one query per chunk, reading only rows where one of them is set"""
+        samples = {}
+        chunks = self._column_chunks(columns, chunk_size)
+        for index, chunk in enumerate(chunks):
+            condition = ' OR '.join(f"{column} IS NOT NULL" for column in chunk)
+            sql = f"SELECT {', '.join(chunk)} FROM {schema}.{table} WHERE {condition} LIMIT {sample_size}"
             try:
-                sql = f"SELECT AI_DESCRIBE_COLUMNS('{schema}.{table}')"
-                cursor.execute(sql)
-                result = cursor.fetchone()
-                if result and result[0]:
-                    # Parse the result into a dictionary of column name -> description
-                    if isinstance(result[0], dict):
-                        return result[0]
+                samples.update(self._run_query(sql, SAMPLE, f"{schema}.{table}",
+                                               fetch=lambda cursor: self._fetch_sample_columns(cursor, chunk)))
+            except QueryBudgetExceeded:
+                self.governor.refuse(SAMPLE, len(chunks) - index - 1)
+                break
             except Exception as e:
-                logger.info(f"AI_DESCRIBE_COLUMNS function not available, using spacy-based descriptions: {e}")
-            
-            # Try getting existing comments from information schema
-            existing_comments = {}
+                logger.warning(f"Error sampling non-null values of {len(chunk)} sparse columns of {schema}.{table}: {e}")
+        return samples
+    
+    def _stats_query_count(self, column_count: int) -> int:
+        """Number of chunked sample or profile queries needed for this many columns of a table"""
+        return (column_count + SAMPLE_COLUMN_CHUNK_SIZE - 1) // SAMPLE_COLUMN_CHUNK_SIZE
+    
+    def _column_chunks(self, columns: List[str], chunk_size: int = SAMPLE_COLUMN_CHUNK_SIZE) -> List[List[str]]:
+        """Split a column list into chunks small enough for one sample query each"""
+        return [columns[start:start + chunk_size] for start in range(0, len(columns), chunk_size)]
+    
+    def _sample_sql(self, schema: str, table: str, columns: List[str], sample_size: int = 100) -> str:
+        """Build the row sample query for a chunk of columns"""
+        return f"SELECT {', '.join(columns)} FROM {schema}.{table} SAMPLE ({sample_size} ROWS)"
+    
+    def _arrow_enabled(self, cursor: Any) -> bool:
+        """Check whether a result can be fetched through Arrow"""
+        return self.use_arrow and hasattr(cursor, 'fetch_arrow_all')
+    
+    def _fetch_rows(self, cursor: Any) -> List[Tuple]:
+        """Fetch all rows, decoding them column by column from Arrow when available"""
+        if not self._arrow_enabled(cursor):
+            return cursor.fetchall()
+        
+        table = cursor.fetch_arrow_all()
+        if table is None:  # Empty result
+            return []
+        return list(zip(*(table.column(index).to_pylist() for index in range(table.num_columns))))
+    
+    def _fetch_sample_columns(self, cursor: Any, columns: List[str]) -> Dict[str, Any]:
+        """Fetch a sample result as per-column non-null values, kept as Arrow arrays when available"""
+        if not self._arrow_enabled(cursor):
+            return self._split_sample_rows(columns, cursor.fetchall())
+        
+        table = cursor.fetch_arrow_all()
+        if table is None:  # No rows sampled
+            return {column: [] for column in columns}
+        return {column: table.column(index).drop_null() for index, column in enumerate(columns)}
+    
+    def get_table_profile(self, schema: str, table: str, columns: List[Dict[str, str]],
+                          chunk_size: int = SAMPLE_COLUMN_CHUNK_SIZE) -> Dict[str, Dict[str, Any]]:
+        """Profile whole-table column statistics in Snowflake with one aggregate query per chunk of columns"""
+        profiles = {}
+        chunks = self._column_chunks(columns, chunk_size)
+        for index, chunk in enumerate(chunks):
+            if not self.governor.allows(PROFILE):
+                self.governor.refuse(PROFILE, len(chunks) - index)
+                break
+            sql, layout = self._profile_sql(schema, table, chunk)
             try:
-                sql = f"""
-                SELECT column_name, comment 
-                FROM information_schema.columns 
-                WHERE table_schema = '{schema}' 
-                AND table_name = '{table}'
-                """
-                cursor.execute(sql)
-                for row in cursor.fetchall():
-                    if row[1]:  # If comment exists
-                        existing_comments[row[0]] = row[1]
+                profiles.update(self._run_query(sql, PROFILE, f"{schema}.{table}",
+                                                fetch=lambda cursor: self._parse_profile_row(layout, self._fetch_rows(cursor)[0])))
+            except QueryBudgetExceeded:
+                # The governor counted this chunk, count the ones after it
+                self.governor.refuse(PROFILE, len(chunks) - index - 1)
+                break
             except Exception as e:
-                logger.info(f"Column comments not available: {e}")
-            
-            # Process each column
-            for column_info in columns:
-                column_name = column_info['name']
-                data_type = column_info['type']
-                
-                # First use existing comment if available
-                if column_name in existing_comments:
-                    descriptions[column_name] = existing_comments[column_name]
-                    continue
-                
-                # Otherwise, get sample data and generate description
-                sample_data = self.get_sample_data(schema, table, column_name)
-                
-                # Generate description using our NLP-based generator
-                description = self.description_generator.generate_column_description(
-                    column_name, data_type, sample_data
-                )
-                
-                descriptions[column_name] = description
+                logger.warning(f"Error profiling {len(chunk)} columns of {schema}.{table}: {e}")
+        return profiles
+    
+    def _profile_type_category(self, data_type: str) -> str:
+        """Classify a column type to decide which aggregates apply to it"""
+        type_name = (data_type or '').split('(')[0].upper()
+        if type_name in ('NUMBER', 'DECIMAL', 'NUMERIC', 'INT', 'INTEGER', 'BIGINT', 'SMALLINT', 'TINYINT',
+                         'BYTEINT', 'FLOAT', 'FLOAT4', 'FLOAT8', 'DOUBLE', 'DOUBLE PRECISION', 'REAL'):
+            return 'numeric'
+        if type_name in ('DATE', 'TIME', 'DATETIME') or type_name.startswith('TIMESTAMP'):
+            return 'temporal'
+        if type_name in ('VARCHAR', 'CHAR', 'CHARACTER', 'STRING', 'TEXT'):
+            return 'text'
+        if type_name == 'BOOLEAN':
+            return 'boolean'
+        # VARIANT, OBJECT, ARRAY, GEOGRAPHY, BINARY etc. only get a null count
+        return 'other'
+    
+    def _profile_sql(self, schema: str, table: str, columns: List[Dict[str, str]]) -> Tuple[str, List[Tuple[str, str, str]]]:
+        """Build one aggregate query profiling a chunk of columns, plus the layout of its result row"""
+        expressions = ["COUNT(*)"]
+        layout = [('', 'row_count', '')]
+        for column_info in columns:
+            name = column_info['name']
+            category = self._profile_type_category(column_info['type'])
+            aggregates = [('null_count', f"COUNT_IF({name} IS NULL)")]
+            if category != 'other':
+                aggregates.append(('distinct_count', f"APPROX_COUNT_DISTINCT({name})"))
+            if category in ('numeric', 'temporal'):
+                aggregates += [('min', f"MIN({name})"), ('max', f"MAX({name})")]
+            if category == 'numeric':
+                aggregates.append(('avg', f"AVG({name})"))
+            if category in ('text', 'boolean'):
+                aggregates.append(('top_k', f"APPROX_TOP_K({name}, {PROFILE_TOP_K})"))
             
-            return descriptions
+            for key, expression in aggregates:
+                expressions.append(expression)
+                layout.append((name, key, category))
+        
+        return f"SELECT {', '.join(expressions)} FROM {schema}.{table}", layout
+    
+    def _parse_profile_row(self, layout: List[Tuple[str, str, str]], row: Tuple) -> Dict[str, Dict[str, Any]]:
+        """Turn the aggregate result row into a profile dictionary per column"""
+        row_count = row[0]
+        profiles = {}
+        for (name, key, category), value in zip(layout[1:], row[1:]):
+            profile = profiles.setdefault(name, {'category': category, 'row_count': row_count})
+            if key == 'top_k' and isinstance(value, str):
+                # APPROX_TOP_K returns a VARIANT array of [value, count] pairs
+                value = json.loads(value)
+            profile[key] = value
+        return profiles
+    
+    def _optional_query(self, capability: str, schema: str, table: str, run: Callable[[], Any], default: Any) -> Any:
+        """Run a query through an optional capability, probing it once per session; only errors showing the
+        capability is missing mark it unavailable, any other failure just falls back for this table"""
+        probing = self.capabilities.acquire_probe(capability)
+        try:
+            if self.capabilities.is_available(capability) is False:
+                return default
+            result = run()
+            self.capabilities.record(capability, True)
+            return result
+        except QueryBudgetExceeded:
+            # The budget ran out while this query waited, which says nothing about the capability
+            return default
+        except Exception as e:
+            if is_unavailable_error(e):
+                logger.info(f"{capability} not available, using spacy-based descriptions: {e}")
+                self.capabilities.record(capability, False)
+            else:
+                logger.warning(f"{capability} lookup failed for {schema}.{table}: {e}")
+            return default
         finally:
-            cursor.close()
+            if probing:
+                self.capabilities.release_probe(capability)
+    
+    def _ai_describe_table(self, schema: str, table: str) -> Optional[str]:
+        """Get a table description from the Cortex AI_DESCRIBE_TABLE function"""
+        if self.capabilities.is_available(AI_DESCRIBE_TABLE) is False:
+            return None
+        if not self.governor.allows(AI):
+            self.governor.refuse(AI)
+            return None
+        
+        result = self._optional_query(AI_DESCRIBE_TABLE, schema, table, lambda: self._run_query(
+            f"SELECT AI_DESCRIBE_TABLE('{schema}.{table}')", AI, f"{schema}.{table}", fetch=lambda cursor: cursor.fetchone()
+        ), None)
+        return result[0] if result and result[0] else None
+    
+    def _ai_describe_columns(self, schema: str, table: str) -> Optional[Dict[str, str]]:
+        """Get column descriptions from the Cortex AI_DESCRIBE_COLUMNS function"""
+        if self.capabilities.is_available(AI_DESCRIBE_COLUMNS) is False:
+            return None
+        if not self.governor.allows(AI):
+            self.governor.refuse(AI)
+            return None
+        
+        result = self._optional_query(AI_DESCRIBE_COLUMNS, schema, table, lambda: self._run_query(
+            f"SELECT AI_DESCRIBE_COLUMNS('{schema}.{table}')", AI, f"{schema}.{table}", fetch=lambda cursor: cursor.fetchone()
+        ), None)
+        # Parse the result into a dictionary of column name -> description
+        if result and isinstance(result[0], dict):
+            return result[0]
+        return None
+    
+    def _get_table_comment(self, schema: str, table: str) -> Optional[str]:
+        """Get the existing table comment from the information schema, memoized for the run"""
+        def load() -> Optional[str]:
+            result = self._optional_query(TABLE_COMMENTS, schema, table, lambda: self._run_query(
+                self._table_comment_sql(schema, table), COMMENTS, f"{schema}.{table}", fetch=lambda cursor: cursor.fetchone()
+            ), None)
+            return result[0] if result else None
+        
+        return self.cache.get_or_load('table_comment', schema, table, load)
+    
+    def _get_column_comments(self, schema: str, table: str) -> Dict[str, str]:
+        """Get existing column comments from the information schema, memoized for the run"""
+        def load() -> Dict[str, str]:
+            return self._optional_query(COLUMN_COMMENTS, schema, table, lambda: self._parse_column_comments(
+                self._run_query(self._column_comments_sql(schema, table), COMMENTS, f"{schema}.{table}")
+            ), {})
+        
+        return self.cache.get_or_load('column_comments', schema, table, load)
+    
+    def _table_comment_sql(self, schema: str, table: str) -> str:
+        """Build the information schema query for a table comment"""
+        information_schema, schema_name = self._information_schema(schema)
+        return (f"SELECT COMMENT FROM {information_schema}.tables "
+                f"WHERE table_schema = '{schema_name}' AND table_name = '{_sql_string(table)}'")
+    
+    def _column_comments_sql(self, schema: str, table: str) -> str:
+        """Build the information schema query for the column comments of a table"""
+        information_schema, schema_name = self._information_schema(schema)
+        return f"""
+        SELECT column_name, comment 
+        FROM {information_schema}.columns 
+        WHERE table_schema = '{schema_name}' 
+        AND table_name = '{_sql_string(table)}'
+        """
+    
+    def _parse_column_comments(self, rows: List[Tuple]) -> Dict[str, str]:
+        """Map column names to comments, skipping columns without one"""
+        comments = {}
+        for row in rows:
+            if row[1]:  # If comment exists
+                comments[row[0]] = row[1]
+        return comments
     
     def close(self) -> None:
         """Close the Snowflake connection"""
+        if self.pool:
+            self.pool.close_all(keep=self.conn)
+            self.pool = None
         if self.conn:
             self.conn.close()
             logger.info("Closed Snowflake connection")
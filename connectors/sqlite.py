@@ -0,0 +1,198 @@
+"""
+SQLite connector serving metadata, comments and samples from a local database file.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import datetime
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from connectors.base import MetadataConnector, TableInfo
+from connectors.governor import QueryBudgetExceeded, METADATA, COMMENTS, SAMPLE
+
+logger = logging.getLogger(__name__)
+
+# Optional table of table and column comments, since SQLite has no COMMENT syntax;
+# rows are (table_name, column_name, comment) with a NULL column_name for the table comment
+COMMENTS_TABLE = '_dbt_comments'
+
+class SQLiteConnector(MetadataConnector):
+    """Connector for a local SQLite file, where the main and attached databases are the schemas"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize with the database name and the path of the SQLite file"""
+        super().__init__(config)
+        self.path = config['path']
+        # SQLite connections can't be shared across threads, so each worker opens its own
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+    
+    def connect(self) -> Any:
+        """Open a read-only connection to the SQLite file"""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"SQLite database not found: {self.path}")
+        self.conn = self._connection()
+        logger.info(f"Opened SQLite database {self.path}")
+        return self.conn
+    
+    def create_pool(self, size: int) -> Any:
+        """Workers open their own connection on first use, so there is nothing to pool"""
+        return None
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Closed from the main thread at the end of the run, otherwise only used by the thread that opened it
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def _query(self, sql: str, phase: str, params: Tuple = (), table: Optional[str] = None) -> List[Tuple]:
+        """Run a query within the governor's concurrency limit and budget, recording it in the tracer"""
+        self.governor.acquire(phase)
+        start = time.perf_counter()
+        try:
+            with self._profile_query(phase), self.tracer.span(sql, phase, table) as span:
+                rows = self._connection().execute(sql, params).fetchall()
+                span.set_result(rows)
+            return rows
+        finally:
+            self.governor.release(time.perf_counter() - start)
+    
+    def _quote(self, identifier: str) -> str:
+        """Quote an identifier for use in SQL"""
+        return '"' + identifier.replace('"', '""') + '"'
+    
+    def get_databases(self) -> List[str]:
+        """The SQLite file is the only database"""
+        return [self.config['database']]
+    
+    def get_schemas(self, database: Optional[str] = None) -> List[str]:
+        """Get the main and attached databases of the connection"""
+        return [row[1] for row in self._query("PRAGMA database_list", METADATA) if row[1] != 'temp']
+    
+    def get_tables(self, schema: str) -> List[TableInfo]:
+        """Get list of tables and views in a schema"""
+        rows = self._query(
+            f"SELECT name, type FROM {self._quote(schema)}.sqlite_master "
+            f"WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\' AND name != ? ORDER BY name",
+            METADATA, (COMMENTS_TABLE,)
+        )
+        
+        # SQLite keeps no per-table change time, so any write to the file counts as a change to every table
+        last_altered = datetime.datetime.fromtimestamp(os.path.getmtime(self.path)).isoformat()
+        self._load_comments(schema, [row[0] for row in rows])
+        return [TableInfo(name=name, comment=self.cache.get('table_comment', schema, name),
+                          last_altered=last_altered, kind=kind.upper())
+                for name, kind in rows]
+    
+    def _load_comments(self, schema: str, tables: List[str]) -> None:
+        """Seed the run cache with the comments of every table from the comments table, if there is one"""
+        table_comments = {}
+        column_comments = {table: {} for table in tables}
+        exists = self._query(f"SELECT 1 FROM {self._quote(schema)}.sqlite_master WHERE type = 'table' AND name = ?",
+                             METADATA, (COMMENTS_TABLE,))
+        if exists:
+            for table, column, comment in self._query(
+                    f"SELECT table_name, column_name, comment FROM {self._quote(schema)}.{COMMENTS_TABLE}", COMMENTS):
+                if not comment:
+                    continue
+                if column is None:
+                    table_comments[table] = comment
+                else:
+                    column_comments.setdefault(table, {})[column] = comment
+        
+        for table in tables:
+            self.cache.put('table_comment', schema, table, table_comments.get(table))
+            self.cache.put('column_comments', schema, table, column_comments.get(table, {}))
+    
+    def get_columns(self, schema: str, table: str) -> List[Dict[str, str]]:
+        """Get column information for a table"""
+        def load() -> List[Dict[str, str]]:
+            rows = self._query(f"PRAGMA {self._quote(schema)}.table_info({self._quote(table)})", METADATA,
+                               table=f"{schema}.{table}")
+            return [{'name': row[1], 'type': row[2], 'nullable': 'N' if row[3] else 'Y'} for row in rows]
+        
+        return self.cache.get_or_load('columns', schema, table, load)
+    
+    def get_all_columns(self, schema: str) -> Dict[str, List[Dict[str, str]]]:
+        """Get column information for every table in a schema with a single query, keyed by table"""
+        rows = self._query(
+            f"SELECT m.name, p.name, p.type, p.\"notnull\" FROM {self._quote(schema)}.sqlite_master AS m "
+            f"JOIN pragma_table_info(m.name, ?) AS p WHERE m.type IN ('table', 'view') ORDER BY m.name, p.cid",
+            METADATA, (schema,)
+        )
+        columns_by_table = {}
+        for table, name, data_type, not_null in rows:
+            columns_by_table.setdefault(table, []).append({'name': name, 'type': data_type, 'nullable': 'N' if not_null else 'Y'})
+        
+        # Seed the run cache so later per-table lookups don't query again
+        for table, columns in columns_by_table.items():
+            self.cache.put('columns', schema, table, columns)
+        return columns_by_table
+    
+    def get_sample_data(self, schema: str, table: str, column: str, sample_size: int = 100) -> List[Any]:
+        """Get the first non-null values of a column; local extracts are read in file order so runs are repeatable"""
+        try:
+            rows = self._query(
+                f"SELECT {self._quote(column)} FROM {self._quote(schema)}.{self._quote(table)} "
+                f"WHERE {self._quote(column)} IS NOT NULL LIMIT ?",
+                SAMPLE, (sample_size,), f"{schema}.{table}"
+            )
+        except (sqlite3.Error, QueryBudgetExceeded) as e:
+            logger.warning(f"Error getting sample data for {schema}.{table}.{column}: {e}")
+            return []
+        return [row[0] for row in rows]
+    
+    def get_table_sample(self, schema: str, table: str, columns: List[str], sample_size: int = 100) -> Dict[str, List[Any]]:
+        """Get the first rows of a table for many columns with one query"""
+        if not columns:
+            return {}
+        try:
+            rows = self._query(
+                f"SELECT {', '.join(self._quote(column) for column in columns)} "
+                f"FROM {self._quote(schema)}.{self._quote(table)} LIMIT ?",
+                SAMPLE, (sample_size,), f"{schema}.{table}"
+            )
+        except (sqlite3.Error, QueryBudgetExceeded) as e:
+            logger.warning(f"Error sampling {len(columns)} columns of {schema}.{table}: {e}")
+            return {}
+        return self._split_sample_rows(columns, rows)
+    
+    def get_non_null_sample(self, schema: str, table: str, columns: List[str], sample_size: int = 100) -> Dict[str, List[Any]]:
+        """Get non-null values for sparse columns with one query, reading only rows where one of them is set"""
+        condition = ' OR '.join(f"{self._quote(column)} IS NOT NULL" for column in columns)
+        try:
+            rows = self._query(
+                f"SELECT {', '.join(self._quote(column) for column in columns)} "
+                f"FROM {self._quote(schema)}.{self._quote(table)} WHERE {condition} LIMIT ?",
+                SAMPLE, (sample_size,), f"{schema}.{table}"
+            )
+        except (sqlite3.Error, QueryBudgetExceeded) as e:
+            logger.warning(f"Error sampling non-null values of {len(columns)} sparse columns of {schema}.{table}: {e}")
+            return {}
+        return self._split_sample_rows(columns, rows)
+    
+    def _get_table_comment(self, schema: str, table: str) -> Optional[str]:
+        """Get the table comment loaded with the table list"""
+        return self.cache.get('table_comment', schema, table)
+    
+    def _get_column_comments(self, schema: str, table: str) -> Dict[str, str]:
+        """Get the column comments loaded with the table list"""
+        return self.cache.get('column_comments', schema, table) or {}
+    
+    def close(self) -> None:
+        """Close every thread's connection"""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self.conn = None
+        logger.info("Closed SQLite database")
@@ -0,0 +1,185 @@
+"""
+Per-query instrumentation with a slowest-statement summary and Chrome trace export.
+"""
+
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Literals replaced when fingerprinting, so the same statement shape on different values groups together
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+def fingerprint(sql: str) -> str:
+    """Hash a statement with its literals and whitespace normalized"""
+    normalized = _NUMBER_LITERAL.sub('?', _STRING_LITERAL.sub('?', ' '.join(sql.split()))).upper()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]
+
+def _estimate_bytes(result: Any) -> int:
+    """Roughly size a fetched result: Arrow buffer sizes, or the length of each Python value"""
+    if hasattr(result, 'nbytes'):
+        return result.nbytes
+    if isinstance(result, dict):
+        return sum(_estimate_bytes(value) for value in result.values())
+    if isinstance(result, (list, tuple)):
+        return sum(_estimate_bytes(value) for value in result)
+    if result is None:
+        return 0
+    if isinstance(result, (str, bytes)):
+        return len(result)
+    if isinstance(result, (int, float, bool)):
+        return 8
+    return len(str(result))
+
+@dataclass
+class QueryRecord:
+    """One executed query"""
+    sql: str
+    fingerprint: str
+    phase: str
+    table: Optional[str]
+    thread: str
+    start: float
+    elapsed: float = 0.0
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    error: Optional[str] = None
+
+class QuerySpan:
+    """Handle for the query being timed, used to attach what it fetched"""
+    
+    def __init__(self, record: QueryRecord, measure_bytes: bool):
+        """Wrap the record being filled in"""
+        self.record = record
+        self._measure_bytes = measure_bytes
+    
+    def set_result(self, result: Any, rowcount: Optional[int] = None) -> None:
+        """Record the row count and approximate size of the fetched result"""
+        if isinstance(rowcount, int) and rowcount >= 0:
+            self.record.rows = rowcount
+        elif isinstance(result, list):
+            self.record.rows = len(result)
+        elif isinstance(result, dict) and all(isinstance(values, list) for values in result.values()):
+            # Row samples are split into one list of values per column
+            self.record.rows = max((len(values) for values in result.values()), default=0)
+        if self._measure_bytes:
+            self.record.bytes = _estimate_bytes(result)
+
+class QueryTracer:
+    """Collects a record per query for the end-of-run summary and trace export"""
+    
+    def __init__(self, measure_bytes: bool = False):
+        """Initialize; measuring fetched bytes walks every result, so it is only on when a trace is exported"""
+        self.measure_bytes = measure_bytes
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.records: List[QueryRecord] = []
+    
+    def _new_record(self, sql: str, phase: str, table: Optional[str], start: float) -> QueryRecord:
+        """Create a record for a query starting now"""
+        return QueryRecord(sql=' '.join(sql.split()), fingerprint=fingerprint(sql), phase=phase, table=table,
+                           thread=threading.current_thread().name, start=start - self._origin)
+    
+    @contextmanager
+    def span(self, sql: str, phase: str, table: Optional[str] = None) -> Iterator[QuerySpan]:
+        """Time a query run in the block, including fetching its result, and record any error"""
+        start = time.perf_counter()
+        record = self._new_record(sql, phase, table, start)
+        try:
+            yield QuerySpan(record, self.measure_bytes)
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            record.elapsed = time.perf_counter() - start
+            with self._lock:
+                self.records.append(record)
+    
+    def add(self, sql: str, phase: str, table: Optional[str], start: float, result: Any = None,
+            rowcount: Optional[int] = None, error: Optional[Exception] = None) -> None:
+        """Record a query timed by the caller, such as an async query polled from an event loop"""
+        record = self._new_record(sql, phase, table, start)
+        record.elapsed = time.perf_counter() - start
+        if error is not None:
+            record.error = str(error)
+        else:
+            QuerySpan(record, self.measure_bytes).set_result(result, rowcount)
+        with self._lock:
+            self.records.append(record)
+    
+    def slowest(self, count: int) -> List[QueryRecord]:
+        """Get the slowest queries"""
+        with self._lock:
+            return sorted(self.records, key=lambda record: -record.elapsed)[:count]
+    
+    def phase_totals(self) -> Dict[str, Dict[str, float]]:
+        """Get the number of queries and the total seconds spent per phase"""
+        totals = {}
+        with self._lock:
+            for record in self.records:
+                total = totals.setdefault(record.phase, {'queries': 0, 'seconds': 0.0, 'errors': 0})
+                total['queries'] += 1
+                total['seconds'] += record.elapsed
+                total['errors'] += record.error is not None
+        return totals
+    
+    def log_summary(self, top: int = 10) -> None:
+        """Log per-phase totals and the slowest statements"""
+        for phase, total in sorted(self.phase_totals().items(), key=lambda item: -item[1]['seconds']):
+            logger.info(f"Phase {phase}: {total['queries']} queries, {total['seconds']:.2f}s, {total['errors']} errors")
+        slowest = self.slowest(top)
+        if slowest:
+            logger.info(f"Slowest {len(slowest)} statements:")
+        for record in slowest:
+            rows = '' if record.rows is None else f", {record.rows} rows"
+            error = f", failed: {record.error[:80]}" if record.error else ''
+            logger.info(f"  {record.elapsed:8.3f}s  {record.phase:<9} {record.table or '-'}  "
+                        f"[{record.fingerprint}] {record.sql[:100]}{rows}{error}")
+    
+    def export_chrome_trace(self, path: str) -> None:
+        """Write the queries as Chrome trace events, viewable in chrome://tracing or Perfetto"""
+        with self._lock:
+            records = sorted(self.records, key=lambda record: record.start)
+        
+        # Async queries overlap on one thread, so spread each thread's queries over as many lanes as needed
+        lanes: Dict[str, List[float]] = {}
+        lane_ids: Dict[str, int] = {}
+        events = []
+        for record in records:
+            thread_lanes = lanes.setdefault(record.thread, [])
+            lane = next((index for index, free_at in enumerate(thread_lanes) if free_at <= record.start), len(thread_lanes))
+            if lane == len(thread_lanes):
+                thread_lanes.append(0.0)
+            thread_lanes[lane] = record.start + record.elapsed
+            lane_name = record.thread if lane == 0 else f"{record.thread} #{lane}"
+            if lane_name not in lane_ids:
+                lane_ids[lane_name] = len(lane_ids) + 1
+                events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': lane_ids[lane_name],
+                               'args': {'name': lane_name}})
+            
+            args = {'sql': record.sql, 'fingerprint': record.fingerprint, 'table': record.table,
+                    'rows': record.rows, 'bytes': record.bytes}
+            if record.error:
+                args['error'] = record.error
+            events.append({
+                'name': f"{record.phase} {record.table}" if record.table else record.phase,
+                'cat': record.phase,
+                'ph': 'X',
+                'ts': round(record.start * 1e6),
+                'dur': round(record.elapsed * 1e6),
+                'pid': 1,
+                'tid': lane_ids[lane_name],
+                'args': args
+            })
+        
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        logger.info(f"Wrote trace of {len(records)} queries to {path}")
@@ -11,8 +11,31 @@ import logging
 from typing import Dict, List, Any
 
 # Import local modules
-from connectors.snowflake import SnowflakeConnector
+from connectors.base import STATS_MODES
+from connectors.sqlite import SQLiteConnector
+from connectors.governor import QueryGovernor
+from connectors.replay import QueryRecorder, QueryReplay
+from connectors.tracing import QueryTracer
 from generators.yaml_generator import DbtYamlGenerator
+from generators.scheduler import (
+    GenerationScheduler,
+    GenerationTarget,
+    GLOB_CHARS,
+    output_path_for,
+    resolve_targets,
+    split_patterns
+)
+from utils.checkpoint import CheckpointJournal
+from utils.incremental_cache import IncrementalCache
+from utils.description_store import DescriptionStore, DEFAULT_STORE_SIZE
+from utils.profiler import RunProfiler, CONNECT
+from utils.description_generator import (
+    configure_spacy_model,
+    description_version,
+    SPACY_PIPELINES,
+    DEFAULT_NLP_BATCH_SIZE,
+    DEFAULT_NLP_PROCESSES
+)
 from utils.config_loader import (
     load_env_file, 
     get_snowflake_config, 
@@ -31,63 +54,260 @@ def main():
     """Main entry point for the script"""
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='dbt YAML Generator for Snowflake')
+    parser.add_argument('--backend', choices=('snowflake', 'sqlite'), default='snowflake',
+                        help='Where metadata and samples are read from: Snowflake, or a local SQLite file given by --sqlite-path')
+    parser.add_argument('--sqlite-path', help='Path to the SQLite database file used by --backend sqlite')
+    parser.add_argument('--record', help='Record every Snowflake query and its result to this file for later --replay')
+    parser.add_argument('--replay', help='Answer queries from a file written by --record instead of connecting to Snowflake')
+    parser.add_argument('--replay-latency', default='recorded',
+                        help="Simulated query latency in seconds when replaying: 'recorded', 'fixed:S', 'uniform:MIN,MAX' "
+                             "or 'lognormal:MEDIAN,SIGMA'")
+    parser.add_argument('--replay-concurrency', type=int, default=0,
+                        help='Number of queries the simulated warehouse runs at once when replaying, others queue (0 for no limit)')
+    parser.add_argument('--replay-seed', type=int, default=0, help='Random seed for the replay latency distribution')
     parser.add_argument('--env-file', default='.env', help='Path to environment variables file')
     parser.add_argument('--tests-config', default='tests_config.yaml', help='Path to tests configuration file')
-    parser.add_argument('--output', help='Output path for the dbt YAML file (overrides env var)')
-    parser.add_argument('--schema', help='Schema to use (overrides env var)')
+    parser.add_argument('--output',
+                        help='Output path for the dbt YAML file (overrides env var), may contain {database} and {schema} placeholders')
+    parser.add_argument('--schema', help='Schema to use (overrides env var), or a comma-separated list of names or glob patterns')
+    parser.add_argument('--database', help='Database to use (overrides env var), or a comma-separated list of names or glob patterns')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of tables to process concurrently, each worker using its own Snowflake connection')
+    parser.add_argument('--async-queries', type=int, default=0,
+                        help='Prefetch metadata and samples with async query submission, keeping at most this many queries in flight (0 disables)')
+    parser.add_argument('--incremental-cache',
+                        help='Path to a cache file of generated descriptions; only tables altered since the last run are re-profiled')
+    parser.add_argument('--description-store',
+                        help='Path to a SQLite store of column descriptions; columns whose name, type and sampled data '
+                             'are unchanged since an earlier run skip the analysis and NLP')
+    parser.add_argument('--description-store-size', type=int, default=DEFAULT_STORE_SIZE,
+                        help='Maximum number of columns kept in the description store, least recently used are evicted')
+    parser.add_argument('--checkpoint',
+                        help='Journal finished table models to this file so an interrupted run can be resumed; '
+                             'removed once all YAML files are written')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip tables already finished in the --checkpoint journal of an interrupted run')
+    parser.add_argument('--stats-mode', choices=STATS_MODES, default='sample',
+                        help="How column statistics are gathered: 'sample' pulls up to 100 rows per table, "
+                             "'server' profiles whole tables with one aggregate query in Snowflake")
+    parser.add_argument('--capability-cache', default=os.path.join('~', '.cache', 'dbt_yaml_generator', 'capabilities.json'),
+                        help='File caching which Cortex AI and comment queries work for each account and role')
+    parser.add_argument('--capability-ttl-hours', type=float, default=24,
+                        help='Hours before cached capability probes are re-checked')
+    parser.add_argument('--max-concurrent-queries', type=int, default=0,
+                        help='Maximum number of Snowflake queries running at once across all workers (0 for no limit)')
+    parser.add_argument('--max-queries', type=int, default=0,
+                        help='Query budget for the run; once spent, remaining tables get metadata-only descriptions (0 for no limit)')
+    parser.add_argument('--max-query-seconds', type=float, default=0,
+                        help='Budget of total query execution seconds for the run, enforced like --max-queries (0 for no limit)')
+    parser.add_argument('--statement-timeout', type=int, default=0,
+                        help='Cancel any single query running longer than this many seconds (0 keeps the account default)')
+    parser.add_argument('--spacy-model',
+                        help='spaCy model package name or local model directory used for entity recognition '
+                             '(overrides the SPACY_MODEL env var, defaults to en_core_web_sm)')
+    parser.add_argument('--spacy-pipeline', choices=SPACY_PIPELINES,
+                        help="spaCy components to load: 'ner' only what entity recognition needs, 'full' every "
+                             "component of the model (overrides the SPACY_PIPELINE env var, defaults to ner)")
+    parser.add_argument('--nlp-batch-size', type=int, default=DEFAULT_NLP_BATCH_SIZE,
+                        help='Number of column samples per spaCy nlp.pipe batch')
+    parser.add_argument('--nlp-processes', type=int, default=DEFAULT_NLP_PROCESSES,
+                        help='Number of processes spaCy uses per table for entity recognition; more than 1 only pays '
+                             'off for tables with many text columns')
+    parser.add_argument('--run-id', help='Run identifier recorded in the QUERY_TAG of every query (defaults to a timestamp)')
+    parser.add_argument('--trace', help='Write every query with its phase, table, timing and result size to this Chrome trace file')
+    parser.add_argument('--trace-top', type=int, default=10,
+                        help='Number of slowest statements to log at the end of the run (0 disables the summary)')
+    parser.add_argument('--profile',
+                        help='Profile the run: write cProfile stats to this file and log wall and CPU time per phase')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='With --profile, also trace allocations and report the peak memory of each phase')
     args = parser.parse_args()
+    if args.backend == 'sqlite' and (args.record or args.replay):
+        # Only Snowflake queries are recorded and replayed, a SQLite run would silently ignore them
+        parser.error("--record and --replay require --backend snowflake")
     
     try:
         # Load environment variables from .env file
         load_env_file(args.env_file)
+        if args.profile_memory and not args.profile:
+            raise ValueError("--profile-memory requires --profile")
+        if args.resume and not args.checkpoint:
+            raise ValueError("--resume requires --checkpoint")
+        if args.spacy_model or args.spacy_pipeline:
+            configure_spacy_model(args.spacy_model, args.spacy_pipeline)
         
-        # Get Snowflake configuration from environment variables
-        snowflake_config = get_snowflake_config()
+        if args.backend == 'sqlite':
+            # A local SQLite file is one database whose schemas are its main and attached databases
+            if not args.sqlite_path:
+                raise ValueError("--sqlite-path is required with --backend sqlite")
+            connection_config = {
+                'database': os.path.splitext(os.path.basename(args.sqlite_path))[0],
+                'schema': 'main',
+                'path': args.sqlite_path
+            }
+        elif args.replay:
+            # The recording holds the connection settings, no Snowflake credentials are needed
+            replay = QueryReplay(args.replay, latency=args.replay_latency, concurrency=args.replay_concurrency,
+                                 seed=args.replay_seed)
+            connection_config = dict(replay.config)
+        else:
+            # Get Snowflake configuration from environment variables
+            connection_config = get_snowflake_config()
         
-        # Override schema if specified in command line
+        # Override schema and database if specified in command line, each may be a list or glob patterns
+        default_database = connection_config['database']
         if args.schema:
-            snowflake_config['schema'] = args.schema
-            
+            connection_config['schema'] = args.schema
+        if args.database:
+            connection_config['database'] = args.database
+        database_patterns = split_patterns(connection_config['database'])
+        schema_patterns = split_patterns(connection_config['schema'])
+        
+        # Connect to the first database if several were given, schemas elsewhere are queried fully qualified
+        connection_config['database'] = database_patterns[0] if not any(
+            char in database_patterns[0] for char in GLOB_CHARS) else default_database
+        # The session schema is only a default, so use the first plain schema name or none at all
+        session_schema = next((pattern for pattern in schema_patterns
+                               if not any(char in pattern for char in GLOB_CHARS)), None)
+        if session_schema:
+            connection_config['schema'] = session_schema
+        else:
+            connection_config.pop('schema', None)
+        
         # Get output path
         output_path = args.output if args.output else get_yaml_output_path()
         
         # Load tests configuration
         tests_config = load_tests_config(args.tests_config)
         
-        # Create Snowflake connector and connect
-        connector = SnowflakeConnector(snowflake_config)
-        connector.connect()
+        # Create the connector and connect
+        if args.backend == 'sqlite':
+            connector = SQLiteConnector(connection_config)
+        else:
+            # Imported here so --help, config errors and SQLite runs don't pay for loading the Snowflake driver
+            from connectors.snowflake import SnowflakeConnector
+            connector = SnowflakeConnector(
+                connection_config,
+                # Replayed capability results say nothing about the live account
+                capability_cache_path=None if args.replay else os.path.expanduser(args.capability_cache),
+                capability_ttl_seconds=int(args.capability_ttl_hours * 3600)
+            )
+            if args.replay:
+                connector.replay = replay
+                # Capabilities the recorded run took from its cache were never probed, so they can't be replayed
+                for name, available in replay.capabilities.items():
+                    connector.capabilities.record(name, available)
+            elif args.record:
+                connector.recorder = QueryRecorder(args.record, connection_config, connector.capabilities.summary())
+        connector.stats_mode = args.stats_mode
+        connector.description_generator.batch_size = args.nlp_batch_size
+        connector.description_generator.n_process = args.nlp_processes
+        connector.governor = QueryGovernor(
+            run_id=args.run_id,
+            max_concurrent=args.max_concurrent_queries,
+            max_queries=args.max_queries,
+            max_query_seconds=args.max_query_seconds,
+            statement_timeout=args.statement_timeout
+        )
+        if args.trace:
+            # Sizing fetched results walks every row, so only do it when the trace is kept
+            connector.tracer = QueryTracer(measure_bytes=True)
+        logger.info(f"Tagging queries with run id {connector.governor.run_id}")
+        connector.profiler = RunProfiler(args.profile, memory=args.profile_memory)
+        connector.profiler.start()
+        with connector.profiler.phase(CONNECT):
+            connector.connect()
+            if args.workers > 1:
+                connector.create_pool(args.workers)
+        if args.async_queries > 0:
+            connector.enable_async(args.async_queries)
         
         try:
-            # Get schema and tables
-            schema = snowflake_config['schema']
-            tables = connector.get_tables(schema)
-            
-            if not tables:
-                logger.warning(f"No tables found in schema: {schema}")
+            # Resolve database and schema patterns into the schemas to generate
+            resolved = resolve_targets(connector, database_patterns, schema_patterns)
+            if not resolved:
+                logger.warning(f"No schemas matched {schema_patterns} in databases {database_patterns}")
                 return 0
-            
-            logger.info(f"Found {len(tables)} tables in schema {schema}")
+            targets = [
+                GenerationTarget(database, schema, output_path_for(output_path, database, schema, len(resolved) > 1))
+                for database, schema in resolved
+            ]
             
             # Create YAML generator
-            yaml_generator = DbtYamlGenerator(connector, tests_config)
+            incremental_cache = IncrementalCache(args.incremental_cache) if args.incremental_cache else None
+            description_store = None
+            if args.description_store:
+                description_store = DescriptionStore(args.description_store, description_version(),
+                                                     args.description_store_size)
+                connector.description_generator.store = description_store
+                if args.backend == 'snowflake' and args.stats_mode == 'sample' and not args.replay:
+                    # SAMPLE returns different rows each run, so only small tables fingerprint the same twice
+                    logger.warning("--description-store mostly reuses descriptions with --stats-mode server; "
+                                   "random samples of tables larger than the sample rarely match an earlier run")
+            checkpoint = CheckpointJournal(args.checkpoint, resume=args.resume) if args.checkpoint else None
+            yaml_generator = DbtYamlGenerator(connector, tests_config, incremental_cache, checkpoint)
             
-            # Generate YAML structure
-            yaml_structure = yaml_generator.generate_model_yaml(schema, tables)
+            # Generate and write the YAML for all schemas with shared workers
+            scheduler = GenerationScheduler(connector, yaml_generator, workers=args.workers)
+            try:
+                results = scheduler.run(targets)
+            finally:
+                # Keep whatever was profiled, even if the run fails part way
+                if incremental_cache:
+                    incremental_cache.save()
+                if description_store:
+                    description_store.close()
+                if checkpoint:
+                    checkpoint.close()
             
-            # Write YAML file
-            success = yaml_generator.write_yaml_file(yaml_structure, output_path)
+            if checkpoint and checkpoint.resumed:
+                logger.info(f"Resumed {checkpoint.resumed} tables from checkpoint journal {args.checkpoint}")
+            if checkpoint and all(result.success for result in results):
+                # Every file is written, nothing is left to resume
+                checkpoint.complete()
             
-            if success:
-                logger.info(f"Successfully generated dbt YAML for {len(tables)} tables in {schema}")
-                return 0
-            else:
-                logger.error("Failed to write YAML file")
-                return 1
+            # Report how much metadata was served from the run cache
+            cache_stats = connector.cache.stats()
+            logger.info(f"Metadata cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+            memo_stats = connector.description_generator.entity_memo.stats()
+            logger.info(f"Entity memo: {memo_stats['hits']} hits, {memo_stats['misses']} misses")
+            name_only_stats = connector.description_generator.name_only_stats()
+            logger.info(f"Name-only columns: {name_only_stats['described']} described once and reused "
+                        f"{name_only_stats['reused']} times without sampling")
+            query_stats = connector.governor.summary()
+            logger.info(f"Ran {query_stats['queries']} queries in {query_stats['query_seconds']:.1f}s"
+                        + (f" ({query_stats['tag_changes']} of them query tag switches)" if query_stats['tag_changes'] else "")
+                        + (f", avoided {query_stats['avoided']} sampling queries for name-only columns"
+                           if query_stats['avoided'] else "")
+                        + (f", skipped {query_stats['refused']} sampling, profiling and AI queries over budget"
+                           if query_stats['exhausted'] else ""))
+            if args.trace_top > 0:
+                connector.tracer.log_summary(args.trace_top)
+            if incremental_cache:
+                logger.info(f"Incremental cache: reused {incremental_cache.reused} tables, "
+                            f"recomputed {incremental_cache.recomputed}")
+            if description_store:
+                store_stats = description_store.stats()
+                logger.info(f"Description store: reused {store_stats['hits']} columns, "
+                            f"generated {store_stats['misses']}")
             
+            failed = [result for result in results if not result.success]
+            for result in results:
+                if result.success and result.table_count:
+                    logger.info(f"Successfully generated dbt YAML for {result.table_count} tables in "
+                                f"{result.target.database}.{result.target.schema}")
+            for result in failed:
+                logger.error(f"Failed to write YAML file {result.target.output_path}")
+            return 1 if failed else 0
+        
         finally:
-            # Close the connection
+            # Close the connection, keeping the trace of a failed run too
             connector.close()
+            if args.trace:
+                connector.tracer.export_chrome_trace(args.trace)
+            connector.profiler.stop()
+            if getattr(connector, 'recorder', None):
+                connector.recorder.close()
     
     except Exception as e:
         logger.error(f"Error: {e}", exc_info=True)
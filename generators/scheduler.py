@@ -0,0 +1,122 @@
+"""
+Scheduler that fans the tables of several databases and schemas across shared workers.
+"""
+
+import os
+import fnmatch
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+
+from utils.profiler import YAML_WRITE
+
+logger = logging.getLogger(__name__)
+
+# Characters that turn a database or schema argument into a glob pattern
+GLOB_CHARS = '*?['
+
+@dataclass
+class GenerationTarget:
+    """A database and schema that gets its own dbt YAML file"""
+    database: str
+    schema: str
+    output_path: str
+
+@dataclass
+class TargetResult:
+    """Outcome of generating the YAML file for one target"""
+    target: GenerationTarget
+    table_count: int
+    success: bool
+
+def split_patterns(value: str) -> List[str]:
+    """Split a comma-separated list of names or glob patterns"""
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+def _match(patterns: List[str], list_names: Callable[[], List[str]]) -> List[str]:
+    """Expand glob patterns against the available names, keeping plain names as they are"""
+    names = None
+    matched = []
+    for pattern in patterns:
+        if not any(char in pattern for char in GLOB_CHARS):
+            matched.append(pattern)
+            continue
+        
+        # Only list the available names when a pattern actually needs them
+        if names is None:
+            names = list_names()
+        matched.extend(name for name in names if fnmatch.fnmatch(name.upper(), pattern.upper()))
+    
+    # Drop duplicates while keeping the first-seen order
+    return list(dict.fromkeys(matched))
+
+def resolve_targets(connector, database_patterns: List[str], schema_patterns: List[str]) -> List[Tuple[str, str]]:
+    """Resolve database and schema names or glob patterns into (database, schema) pairs"""
+    targets = []
+    for database in _match(database_patterns, connector.get_databases):
+        schemas = _match(schema_patterns, lambda: connector.get_schemas(database))
+        for schema in schemas:
+            # Patterns shouldn't pull in Snowflake's own metadata schema
+            if schema.upper() == 'INFORMATION_SCHEMA' and schema not in schema_patterns:
+                continue
+            targets.append((database, schema))
+    return targets
+
+def output_path_for(template: str, database: str, schema: str, multiple: bool) -> str:
+    """Get the output path for a target from a path that may contain {database} and {schema} placeholders"""
+    if '{database}' in template or '{schema}' in template:
+        return template.format(database=database, schema=schema)
+    if multiple:
+        # Keep one file per schema by nesting the configured file name under database/schema directories
+        return os.path.join(os.path.dirname(template), database, schema, os.path.basename(template))
+    return template
+
+class GenerationScheduler:
+    """Builds the models of many schemas with one shared set of workers and writes one file per schema"""
+    
+    def __init__(self, connector, yaml_generator, workers: int = 1):
+        """Initialize with a connected connector, the YAML generator and the number of workers"""
+        self.connector = connector
+        self.yaml_generator = yaml_generator
+        self.workers = workers
+    
+    def _qualified_schema(self, target: GenerationTarget) -> str:
+        """Qualify the schema with its database unless it lives in the connection's database"""
+        if target.database.upper() == (self.connector.config.get('database') or '').upper():
+            return target.schema
+        return f"{target.database}.{target.schema}"
+    
+    def run(self, targets: List[GenerationTarget]) -> List[TargetResult]:
+        """Generate and write the YAML files for all targets"""
+        # Load the schema-wide metadata of every target before any table work starts
+        plans = []
+        results = []
+        for target in targets:
+            schema = self._qualified_schema(target)
+            tables = self.connector.get_tables(schema)
+            if not tables:
+                logger.warning(f"No tables found in schema: {schema}")
+                results.append(TargetResult(target, 0, True))
+                continue
+            
+            logger.info(f"Found {len(tables)} tables in schema {schema}")
+            plans.append((target, self.yaml_generator.prepare_schema(schema, tables)))
+        
+        # Fan the tables of all schemas across the same workers
+        jobs = [(plan, table) for _, plan in plans for table in plan.tables]
+        models = self.yaml_generator.build_models(jobs, self.workers)
+        
+        # Models come back in job order, so each schema's models are a contiguous slice
+        offset = 0
+        for target, plan in plans:
+            yaml_structure = {
+                "version": 2,
+                "models": models[offset:offset + len(plan.tables)]
+            }
+            offset += len(plan.tables)
+            
+            with self.connector.profiler.phase(YAML_WRITE):
+                success = self.yaml_generator.write_yaml_file(yaml_structure, target.output_path)
+            results.append(TargetResult(target, len(plan.tables), success))
+        
+        return results
@@ -3,58 +3,207 @@ Module for generating dbt YAML files from Snowflake metadata.
 """
 
 import os
+import time
 import logging
 import textwrap
-from typing import Dict, List, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+
+from connectors.base import TableInfo
+from utils.checkpoint import CheckpointJournal
+from utils.incremental_cache import IncrementalCache, column_signature
+from utils.profiler import METADATA_FETCH, PREFETCH, TABLE_BUILD
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class SchemaPlan:
+    """Schema-wide metadata loaded once before the tables of a schema are built"""
+    schema: str
+    tables: List[Any]
+    columns_by_table: Dict[str, List[Dict[str, str]]]
+    table_states: Dict[str, Any] = field(default_factory=dict)
+    cached_descriptions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
 class DbtYamlGenerator:
     """Generator for dbt YAML files based on Snowflake metadata"""
     
-    def __init__(self, snowflake_connector, tests_config: Dict[str, Any]):
-        """Initialize with Snowflake connector and tests configuration"""
+    def __init__(self, snowflake_connector, tests_config: Dict[str, Any],
+                 incremental_cache: Optional[IncrementalCache] = None,
+                 checkpoint: Optional[CheckpointJournal] = None):
+        """Initialize with Snowflake connector, tests configuration, an optional incremental cache and checkpoint journal"""
         self.snowflake = snowflake_connector
         self.tests_config = tests_config
+        self.incremental_cache = incremental_cache
+        self.checkpoint = checkpoint
+        # Per-worker (tables processed, seconds spent) for the last build_models call
+        self._worker_timings: Dict[str, Any] = {}
+        self._timings_lock = threading.Lock()
     
-    def generate_model_yaml(self, schema: str, tables: List[str]) -> Dict[str, Any]:
-        """Generate the full dbt YAML structure for all tables in a schema"""
+    def generate_model_yaml(self, schema: str, tables: List[Any], workers: int = 1) -> Dict[str, Any]:
+        """Generate the full dbt YAML structure for all tables (TableInfo records or names) in a schema"""
+        plan = self.prepare_schema(schema, tables)
+        
         yaml_structure = {
             "version": 2,
-            "models": []
+            "models": self.build_models([(plan, table) for table in plan.tables], workers)
         }
         
-        for table in tables:
-            # Get table metadata
-            table_description = self.snowflake.get_table_description(schema, table)
-            columns = self.snowflake.get_columns(schema, table)
-            column_descriptions = self.snowflake.get_column_descriptions(schema, table)
-            
-            # Build table model structure
-            table_model = {
-                "name": table,
-                "description": table_description or f"Data from {schema}.{table}",
-                "columns": []
-            }
+        return yaml_structure
+    
+    def prepare_schema(self, schema: str, tables: List[Any]) -> SchemaPlan:
+        """Load schema-wide metadata and decide which tables can reuse cached descriptions"""
+        # Callers may still pass plain table names
+        tables = [TableInfo(table) if isinstance(table, str) else table for table in tables]
+        # Load column metadata for the whole schema up front instead of one DESCRIBE per table
+        with self.snowflake.profiler.phase(METADATA_FETCH):
+            plan = SchemaPlan(schema, tables, self.snowflake.get_all_columns(schema))
+        if tables and not plan.columns_by_table:
+            logger.warning(f"Bulk column metadata returned no columns for the {len(tables)} tables in schema {schema}, "
+                           f"falling back to one DESCRIBE per table"
+                           + (" and recomputing every table instead of using the incremental cache"
+                              if self.incremental_cache else ""))
+        
+        # Decide up front which unchanged tables can reuse cached descriptions, so they are never queried
+        if self.incremental_cache:
+            plan.table_states = {table.name: table.last_altered for table in tables}
+            if any(last_altered is None for last_altered in plan.table_states.values()):
+                # Older SHOW TABLES output has no last_altered column, ask the information schema instead
+                plan.table_states.update(self.snowflake.get_table_states(schema))
+            database = self.snowflake.config.get('database')
+            for table in (table.name for table in tables):
+                columns = plan.columns_by_table.get(table)
+                if columns is None:
+                    continue
+                entry = self.incremental_cache.lookup(database, schema, table, plan.table_states.get(table),
+                                                      column_signature(columns))
+                if entry:
+                    plan.cached_descriptions[table] = entry
+        
+        return plan
+    
+    def build_models(self, jobs: List[Tuple[SchemaPlan, Any]], workers: int = 1) -> List[Dict[str, Any]]:
+        """Build the models for (schema plan, table) jobs, possibly from several schemas, in job order"""
+        # Tables finished before an interrupted run died come straight from the checkpoint journal
+        database = self.snowflake.config.get('database')
+        models = [self.checkpoint.get(database, plan.schema, table.name) if self.checkpoint else None
+                  for plan, table in jobs]
+        remaining = [index for index, model in enumerate(models) if model is None]
+        for model in models:
+            if model is not None:
+                # The tests configuration may have changed since the model was journaled
+                self._apply_tests(model)
+        
+        # With async execution, prefetch a window of tables at a time so samples don't pile up in memory
+        prefetcher = getattr(self.snowflake, 'async_executor', None)
+        window = prefetcher.max_in_flight * 4 if prefetcher else max(len(remaining), 1)
+        
+        self._worker_timings = {}
+        for start in range(0, len(remaining), window):
+            batch_indexes = remaining[start:start + window]
+            batch = [jobs[index] for index in batch_indexes]
+            if prefetcher:
+                pending = {}
+                for plan, table in batch:
+                    if table.name not in plan.cached_descriptions:
+                        pending.setdefault(plan.schema, []).append(table.name)
+                for schema, tables in pending.items():
+                    with self.snowflake.profiler.phase(PREFETCH):
+                        prefetcher.prefetch(schema, tables)
             
-            # Process each column
-            for column_info in columns:
-                column_name = column_info["name"]
-                column_structure = {
-                    "name": column_name,
-                    "description": column_descriptions.get(column_name, f"Column {column_name} from {table}")
-                }
-                
-                # Add tests if defined in the tests config
-                tests = self._get_tests_for_column(column_name)
-                if tests:
-                    column_structure["tests"] = tests
+            if workers > 1:
+                # Start the biggest tables first so a large table doesn't end up running alone at the end
+                order = sorted(range(len(batch)), key=lambda index: -(batch[index][1].bytes or 0))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yaml-worker") as executor:
+                    results = list(executor.map(lambda index: self._timed_build(*batch[index]), order))
                 
-                table_model["columns"].append(column_structure)
-            
-            yaml_structure["models"].append(table_model)
+                # Put the models back in input order so the output is deterministic
+                for index, model in zip(order, results):
+                    models[batch_indexes[index]] = model
+            else:
+                for index, (plan, table) in zip(batch_indexes, batch):
+                    models[index] = self._timed_build(plan, table)
         
-        return yaml_structure
+        # Log how the work was spread across workers
+        for worker, (table_count, elapsed) in sorted(self._worker_timings.items()):
+            logger.info(f"{worker} processed {table_count} tables in {elapsed:.2f}s")
+        
+        return models
+    
+    def _timed_build(self, plan: SchemaPlan, table: Any) -> Dict[str, Any]:
+        """Build one table model on a borrowed connection and record the time spent by this worker"""
+        start = time.perf_counter()
+        with self.snowflake.borrow_connection(), self.snowflake.profiler.phase(TABLE_BUILD):
+            table_model = self._build_table_model(plan, table.name)
+        elapsed = time.perf_counter() - start
+        
+        # Journal the model right away so an interrupted run can resume after it, unless an exhausted
+        # query budget degraded it, so a resumed run describes the table properly
+        if self.checkpoint and not self.snowflake.governor.exhausted:
+            self.checkpoint.record(self.snowflake.config.get('database'), plan.schema, table.name, table_model)
+        
+        worker = threading.current_thread().name
+        with self._timings_lock:
+            table_count, total = self._worker_timings.get(worker, (0, 0.0))
+            self._worker_timings[worker] = (table_count + 1, total + elapsed)
+        return table_model
+    
+    def _build_table_model(self, plan: SchemaPlan, table: str) -> Dict[str, Any]:
+        """Build the dbt model structure for a single table"""
+        schema = plan.schema
+        cached = plan.cached_descriptions.get(table)
+        
+        # Get table metadata, falling back to a per-table lookup if the bulk load missed it
+        columns = plan.columns_by_table.get(table)
+        if columns is None:
+            columns = self.snowflake.get_columns(schema, table)
+        
+        if self.incremental_cache:
+            self.incremental_cache.record(reused=bool(cached))
+        
+        if cached:
+            # Table is unchanged since the last run, reuse its descriptions
+            table_description = cached['table_description']
+            column_descriptions = cached['column_descriptions']
+        else:
+            table_description = self.snowflake.get_table_description(schema, table, columns)
+            column_descriptions = self.snowflake.get_column_descriptions(schema, table, columns)
+            # Descriptions degraded by an exhausted query budget are regenerated next run rather than cached
+            if self.incremental_cache and not self.snowflake.governor.exhausted:
+                self.incremental_cache.store(self.snowflake.config.get('database'), schema, table,
+                                             plan.table_states.get(table), column_signature(columns),
+                                             table_description, column_descriptions)
+        
+        # Build table model structure
+        table_model = {
+            "name": table,
+            "description": table_description or f"Data from {schema}.{table}",
+            "columns": []
+        }
+        
+        # Process each column
+        for column_info in columns:
+            column_name = column_info["name"]
+            column_structure = {
+                "name": column_name,
+                "description": column_descriptions.get(column_name, f"Column {column_name} from {table}")
+            }
+            table_model["columns"].append(column_structure)
+        
+        # Add tests if defined in the tests config
+        self._apply_tests(table_model)
+        return table_model
+    
+    def _apply_tests(self, table_model: Dict[str, Any]) -> None:
+        """Set the tests of every column of a table model from the tests configuration"""
+        for column_structure in table_model["columns"]:
+            tests = self._get_tests_for_column(column_structure["name"])
+            if tests:
+                column_structure["tests"] = tests
+            else:
+                column_structure.pop("tests", None)
     
     def _get_tests_for_column(self, column_name: str) -> List[Any]:
         """Get the list of tests for a column from the tests configuration"""
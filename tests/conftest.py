@@ -0,0 +1,40 @@
+"""
+Shared fixtures: the command line run against the counting fake Snowflake connection.
+"""
+
+import sys
+
+import pytest
+
+@pytest.fixture
+def fake_snowflake(monkeypatch):
+    """Serve every Snowflake connection from one counting fake and set the connection environment variables;
+    the keyword arguments of each connect call are collected in the fake's connect_calls"""
+    snowflake_connector = pytest.importorskip('snowflake.connector')
+    from benchmarks.query_budget import CountingConnection, SchemaShape, SCHEMA
+    
+    fake = CountingConnection(SchemaShape(3, 6), ai_available=False)
+    fake.connect_calls = []
+    
+    def connect(**kwargs):
+        fake.connect_calls.append(kwargs)
+        return fake
+    
+    monkeypatch.setattr(snowflake_connector, 'connect', connect)
+    for name, value in (('SNOWFLAKE_ACCOUNT', 'budget'), ('SNOWFLAKE_USER', 'user'), ('SNOWFLAKE_PASSWORD', 'secret'),
+                        ('DATABASE', 'DB'), ('SCHEMA', SCHEMA)):
+        monkeypatch.setenv(name, value)
+    return fake
+
+@pytest.fixture
+def run_cli(monkeypatch, tmp_path):
+    """Run the command line with the given arguments, without an env file or tests configuration, and return its exit code"""
+    pytest.importorskip('spacy')
+    pytest.importorskip('dotenv')
+    import dbt_yaml_generator
+    
+    def run(*args):
+        monkeypatch.setattr(sys, 'argv', ['dbt_yaml_generator.py', '--env-file', str(tmp_path / 'missing.env'),
+                                          '--tests-config', str(tmp_path / 'missing.yaml'), *args])
+        return dbt_yaml_generator.main()
+    return run
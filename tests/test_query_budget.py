@@ -0,0 +1,114 @@
+"""
+Query-count budgets of the Snowflake connector, checked against the counting fake connection in benchmarks.query_budget.
+"""
+
+import pytest
+
+pytest.importorskip('snowflake.connector')
+pytest.importorskip('spacy')
+
+from benchmarks.query_budget import (
+    CountingSnowflakeConnector,
+    SchemaShape,
+    SCHEMA,
+    EXECUTIONS,
+    DEFAULT_PER_TABLE,
+    DEFAULT_CONSTANT,
+    check_budgets
+)
+from generators.yaml_generator import DbtYamlGenerator
+
+SHAPES = [SchemaShape(tables, columns) for tables in (1, 5, 25) for columns in (4, 40, 250)]
+
+@pytest.mark.parametrize('shape', SHAPES, ids=lambda shape: f"{shape.tables}x{shape.columns}")
+def test_query_budgets(shape):
+    """Every code path stays within its query and query tag budget, with and without workers and async queries"""
+    results = check_budgets([shape], DEFAULT_PER_TABLE, DEFAULT_CONSTANT)
+    failed = [f"{result.name}: {result.queries}/{result.budget} queries, "
+              f"{result.tag_changes}/{result.tag_budget} query tag changes"
+              for result in results if not result.passed]
+    assert not failed, "\n".join(failed)
+
+@pytest.mark.parametrize('workers, async_queries', EXECUTIONS)
+def test_capabilities_probed_once(workers, async_queries):
+    """Unavailable Cortex AI functions are probed once per run, however many tables are built concurrently"""
+    connector = CountingSnowflakeConnector(SchemaShape(12, 8), ai_available=False)
+    connector.connect()
+    if workers > 1:
+        connector.create_pool(workers)
+    if async_queries > 0:
+        connector.enable_async(async_queries)
+    try:
+        connector.fake.reset()
+        tables = connector.get_tables(SCHEMA)
+        yaml_structure = DbtYamlGenerator(connector, {"tests": []}).generate_model_yaml(SCHEMA, tables, workers)
+        statements = connector.fake.statements
+    finally:
+        connector.close()
+    
+    assert len(yaml_structure['models']) == 12
+    assert sum('AI_DESCRIBE_TABLE' in sql for sql in statements) == 1
+    assert sum('AI_DESCRIBE_COLUMNS' in sql for sql in statements) == 1
+
+@pytest.mark.parametrize('workers, async_queries', EXECUTIONS)
+def test_exhausted_budget_stops_sampling(workers, async_queries):
+    """Once --max-queries is spent no more sampling queries run and the skipped ones are counted"""
+    connector = CountingSnowflakeConnector(SchemaShape(6, 8), ai_available=False)
+    connector.connect()
+    connector.governor.max_queries = 4
+    if workers > 1:
+        connector.create_pool(workers)
+    if async_queries > 0:
+        connector.enable_async(async_queries)
+    try:
+        tables = connector.get_tables(SCHEMA)
+        yaml_structure = DbtYamlGenerator(connector, {"tests": []}).generate_model_yaml(SCHEMA, tables, workers)
+        summary = connector.governor.summary()
+    finally:
+        connector.close()
+    
+    assert len(yaml_structure['models']) == 6
+    assert summary['refused'] > 0
+
+@pytest.mark.parametrize('async_queries', [0, 8])
+def test_avoided_queries_counted_once_in_server_mode(async_queries):
+    """Profile queries avoided for name-only columns are counted once, whether or not the profile was prefetched"""
+    connector = CountingSnowflakeConnector(SchemaShape(3, 250), ai_available=False)
+    connector.connect()
+    connector.stats_mode = 'server'
+    if async_queries > 0:
+        connector.enable_async(async_queries)
+    try:
+        tables = connector.get_tables(SCHEMA)
+        DbtYamlGenerator(connector, {"tests": []}).generate_model_yaml(SCHEMA, tables)
+        avoided = connector.governor.summary()['avoided']
+    finally:
+        connector.close()
+    
+    # Each 250-column table needs 3 profile chunks, but only 2 for the 156 columns not described from their names
+    assert avoided == 3
+
+def _prefetched_descriptions(max_queries):
+    """Prefetch the profiles of a schema, then set the query budget and describe the columns of one table"""
+    connector = CountingSnowflakeConnector(SchemaShape(2, 8), ai_available=False)
+    connector.connect()
+    connector.stats_mode = 'server'
+    connector.enable_async(8)
+    try:
+        tables = connector.get_tables(SCHEMA)
+        connector.async_executor.prefetch(SCHEMA, [table.name for table in tables])
+        connector.governor.max_queries = max_queries
+        connector.fake.reset()
+        descriptions = connector.get_column_descriptions(SCHEMA, tables[0].name)
+        return descriptions, connector.fake.statements, connector.governor.summary()
+    finally:
+        connector.close()
+
+def test_prefetched_profile_used_after_budget_runs_out():
+    """A profile prefetched before the budget ran out is used, and nothing is refused for it"""
+    descriptions, statements, summary = _prefetched_descriptions(max_queries=1)
+    unlimited_descriptions, _, _ = _prefetched_descriptions(max_queries=0)
+    
+    assert not [sql for sql in statements if sql.startswith('SELECT COUNT(*)') or ' SAMPLE ' in sql]
+    assert summary['refused'] == 0
+    assert descriptions == unlimited_descriptions
@@ -0,0 +1,34 @@
+"""
+Recording a run against a counting fake connection and replaying it through the command line.
+"""
+
+import json
+import time
+import logging
+
+import pytest
+
+pytest.importorskip('snowflake.connector')
+
+from connectors.capabilities import AI_DESCRIBE_TABLE, AI_DESCRIBE_COLUMNS
+
+def test_replay_of_recording_with_warm_capability_cache(fake_snowflake, run_cli, tmp_path, caplog):
+    """A replay skips the capability probes the recorded run answered from its cache"""
+    # A warm cache already knows the Cortex AI functions are missing, so the recorded run never probes them
+    capability_cache = tmp_path / 'capabilities.json'
+    checked_at = time.time()
+    capability_cache.write_text(json.dumps({'budget|ACCOUNTADMIN': {
+        AI_DESCRIBE_TABLE: {'available': False, 'checked_at': checked_at},
+        AI_DESCRIBE_COLUMNS: {'available': False, 'checked_at': checked_at}
+    }}))
+    
+    recording = tmp_path / 'run.jsonl'
+    assert run_cli('--record', str(recording), '--capability-cache', str(capability_cache),
+                   '--output', str(tmp_path / 'recorded.yml')) == 0
+    assert not any('AI_DESCRIBE' in sql for sql in fake_snowflake.statements)
+    
+    caplog.set_level(logging.WARNING)
+    assert run_cli('--replay', str(recording), '--replay-latency', 'fixed:0',
+                   '--output', str(tmp_path / 'replayed.yml')) == 0
+    assert not [record for record in caplog.records if 'not in recording' in record.getMessage()]
+    assert (tmp_path / 'replayed.yml').read_text() == (tmp_path / 'recorded.yml').read_text()
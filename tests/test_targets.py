@@ -0,0 +1,22 @@
+"""
+Connection settings derived from the --database and --schema lists and patterns.
+"""
+
+import pytest
+
+pytest.importorskip('snowflake.connector')
+
+from benchmarks.query_budget import SCHEMA
+
+@pytest.mark.parametrize('schema_arg, session_schema', [
+    (f"STG_*,{SCHEMA}", SCHEMA),
+    (f"{SCHEMA},STG_*", SCHEMA),
+    ('BUD*', None)
+])
+def test_session_schema_is_a_plain_name(fake_snowflake, run_cli, tmp_path, schema_arg, session_schema):
+    """The connection gets the first plain schema name, never a list or glob pattern"""
+    assert run_cli('--schema', schema_arg, '--capability-cache', str(tmp_path / 'capabilities.json'),
+                   '--output', str(tmp_path / 'schema.yml')) == 0
+    assert fake_snowflake.connect_calls
+    assert all(call.get('schema') == session_schema for call in fake_snowflake.connect_calls)
+    assert (tmp_path / 'schema.yml').exists()
@@ -0,0 +1,106 @@
+"""
+Append-only checkpoint journal of finished table models, so interrupted runs can resume.
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the journaled model layout changes so old journals are not resumed from
+JOURNAL_FORMAT_VERSION = 1
+
+class CheckpointJournal:
+    """JSONL journal with one line per completed table model, keyed by database, schema and table"""
+    
+    def __init__(self, path: str, resume: bool = False):
+        """Open the journal, loading its models when resuming or starting a fresh one otherwise"""
+        self.path = path
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.resumed = 0
+        
+        if resume:
+            self._load()
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if not new_file:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                truncated = f.read(1) != b"\n"
+        self._file = open(self.path, 'a')
+        if new_file:
+            self._write({'version': JOURNAL_FORMAT_VERSION})
+        elif truncated:
+            # Start a fresh line after a partially written entry
+            self._file.write("\n")
+    
+    def _load(self) -> None:
+        """Read the models journaled by an earlier run"""
+        if not os.path.exists(self.path):
+            logger.info(f"No checkpoint journal at {self.path}, starting from the beginning")
+            return
+        
+        with open(self.path, 'r') as f:
+            lines = f.readlines()
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            header = {}
+        if header.get('version') != JOURNAL_FORMAT_VERSION:
+            logger.warning(f"Ignoring checkpoint journal {self.path} written by an incompatible version")
+            os.remove(self.path)
+            return
+        
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The last line may be cut short if the previous run died mid-write
+                continue
+            self._models[entry['key']] = entry['model']
+        logger.info(f"Resuming from {self.path} with {len(self._models)} completed tables")
+    
+    def _key(self, database: str, schema: str, table: str) -> str:
+        """Build the journal key for a table"""
+        return f"{database}.{schema}.{table}"
+    
+    def get(self, database: str, schema: str, table: str) -> Optional[Dict[str, Any]]:
+        """Return the journaled model of a table finished by an earlier run, if any"""
+        with self._lock:
+            model = self._models.get(self._key(database, schema, table))
+            if model is not None:
+                self.resumed += 1
+            return model
+    
+    def record(self, database: str, schema: str, table: str, model: Dict[str, Any]) -> None:
+        """Append a finished table model to the journal"""
+        key = self._key(database, schema, table)
+        with self._lock:
+            self._models[key] = model
+            self._write({'key': key, 'model': model})
+    
+    def _write(self, entry: Dict[str, Any]) -> None:
+        """Write one journal line and flush it so it survives the process being killed"""
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+    
+    def complete(self) -> None:
+        """Remove the journal after every output file was written"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+    
+    def close(self) -> None:
+        """Close the journal file, keeping it for a later --resume"""
+        if not self._file.closed:
+            self._file.close()
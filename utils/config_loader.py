@@ -109,9 +109,9 @@ def get_yaml_output_path() -> str:
         logger.warning("DBT_YAML_OUTPUT_PATH not specified, using default './models/schema.yml'")
         output_path = "./models/schema.yml"
     
-    # Create directories if they don't exist
+    # Create directories if they don't exist, unless the path is a per-schema template
     directory = os.path.dirname(output_path)
-    if directory and not os.path.exists(directory):
+    if directory and '{' not in directory and not os.path.exists(directory):
         os.makedirs(directory)
         logger.info(f"Created directory for output: {directory}")
     
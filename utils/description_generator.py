@@ -2,29 +2,198 @@
 Description generator module using spacy to analyze column data and generate descriptions.
 """
 
+import os
 import re
-import spacy
+import sys
+import json
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
-from collections import Counter
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from collections import Counter, OrderedDict
 
 logger = logging.getLogger(__name__)
 
-# Load spacy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    logger.warning("Spacy model not found. Downloading 'en_core_web_sm'...")
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+# spaCy model used for entity recognition, a package name or a path to a model directory
+DEFAULT_SPACY_MODEL = 'en_core_web_sm'
+SPACY_MODEL_ENV = 'SPACY_MODEL'
+
+# Pipeline profiles: 'ner' keeps only what entity recognition needs, 'full' runs every component of the model
+SPACY_PIPELINES = ('ner', 'full')
+DEFAULT_SPACY_PIPELINE = 'ner'
+SPACY_PIPELINE_ENV = 'SPACY_PIPELINE'
+
+# Documents per nlp.pipe batch and worker processes used for entity recognition
+DEFAULT_NLP_BATCH_SIZE = 64
+DEFAULT_NLP_PROCESSES = 1
+
+# Characters of distinct sample values analyzed per column, most frequent first, to prevent processing too much text
+MAX_SAMPLE_TEXT_LENGTH = 10000
+
+# Distinct values whose entity labels are remembered, so values repeated across columns and tables skip NER
+ENTITY_MEMO_SIZE = 100000
+
+# Bump when the description rules or the sample analysis change, so descriptions stored by earlier runs are discarded
+DESCRIPTION_RULES_VERSION = 1
+
+# Description rules that read sampled values or statistics; columns matching any other rule are described from
+# their name and type alone, so they are never sampled
+SAMPLED_RULES = ('amount', 'flag', 'text')
+
+# Audit and SCD columns with fixed descriptions
+AUDIT_DESCRIPTIONS = {
+    'adt_load_date': 'Audit load date used for record identification across the data pipeline',
+    'adt_file_source': 'Audit file source used for record identification across the data pipeline',
+    'adt_hash_key': 'Hash key used for record identification across the data pipeline',
+    'dbt_scd_id': 'SCD type 2 identifier, used for tracking different versions of a each record',
+    'dbt_updated_at': 'SCD type 2 updated timestamp, indicating when the record was last modified',
+    'dbt_valid_from': 'SCD type 2 validity start timestamp, indicating since when the record was valid',
+    'dbt_valid_to': 'SCD type 2 validity end timestamp, indicating since when the record was valid',
+    'record_sk': 'Unique key identifier for each record'
+}
+
+# Components only doc.ents is read from, so none of them are needed for entity recognition
+NON_NER_COMPONENTS = ['tagger', 'parser', 'lemmatizer', 'attribute_ruler', 'senter', 'morphologizer', 'textcat']
+
+# Process-wide model, loaded on first use since importing spaCy and loading the model takes seconds
+_nlp = None
+_nlp_loaded = False
+_nlp_lock = threading.Lock()
+_spacy_model: Optional[str] = None
+_spacy_pipeline: Optional[str] = None
+
+def configure_spacy_model(model: Optional[str], pipeline: Optional[str] = None) -> None:
+    """Set the spaCy model name or local path and the pipeline profile, overriding their environment variables"""
+    global _spacy_model, _spacy_pipeline
+    with _nlp_lock:
+        if _nlp_loaded:
+            logger.warning(f"spaCy model already loaded, ignoring model setting {model}")
+            return
+        _spacy_model = model or _spacy_model
+        _spacy_pipeline = pipeline or _spacy_pipeline
+
+def load_pipeline(model: str, pipeline: str = DEFAULT_SPACY_PIPELINE) -> Any:
+    """Load a spaCy model with the components of a pipeline profile"""
+    import spacy
+    if pipeline not in SPACY_PIPELINES:
+        raise ValueError(f"Unknown spaCy pipeline '{pipeline}', expected one of: {', '.join(SPACY_PIPELINES)}")
+    if pipeline == 'full':
+        return spacy.load(model)
+    
+    # Excluded components are never deserialized, so loading is faster as well as every document
+    nlp = spacy.load(model, exclude=NON_NER_COMPONENTS)
+    if 'tok2vec' in nlp.pipe_names and 'ner' not in nlp.get_pipe('tok2vec').listening_components:
+        # In models where the NER has its own embedding layer, the shared tok2vec only fed the excluded components
+        nlp.remove_pipe('tok2vec')
+    return nlp
+
+def spacy_settings() -> Tuple[str, str]:
+    """Get the spaCy model and pipeline profile in effect, from the CLI, the environment or the defaults"""
+    return (_spacy_model or os.getenv(SPACY_MODEL_ENV) or DEFAULT_SPACY_MODEL,
+            _spacy_pipeline or os.getenv(SPACY_PIPELINE_ENV) or DEFAULT_SPACY_PIPELINE)
+
+def description_version() -> str:
+    """Version stamp of stored descriptions, covering the rules and the spaCy model they were generated with"""
+    model, pipeline = spacy_settings()
+    return f"{DESCRIPTION_RULES_VERSION}:{model}:{pipeline}"
+
+def get_nlp() -> Optional[Any]:
+    """Get the shared spaCy pipeline, loading it on first call; None if the model is not installed"""
+    global _nlp, _nlp_loaded
+    if _nlp_loaded:
+        return _nlp
+    with _nlp_lock:
+        if not _nlp_loaded:
+            model, pipeline = spacy_settings()
+            try:
+                _nlp = load_pipeline(model, pipeline)
+                logger.info(f"Loaded spaCy model {model} with components {', '.join(_nlp.pipe_names)}")
+            except (ImportError, OSError, ValueError) as e:
+                # Never download implicitly, runs may be offline or on locked-down hosts
+                logger.error(f"spaCy model {model} could not be loaded, entity recognition is disabled: {e}. "
+                             f"Install it with 'python -m spacy download {DEFAULT_SPACY_MODEL}' or set "
+                             f"{SPACY_MODEL_ENV} (or --spacy-model) to a local model directory")
+                _nlp = None
+            _nlp_loaded = True
+    return _nlp
+
+def _is_arrow(data: Any) -> bool:
+    """Check for an Arrow array without importing pyarrow; if data is one, pyarrow is already loaded"""
+    pa = sys.modules.get('pyarrow')
+    return pa is not None and isinstance(data, (pa.Array, pa.ChunkedArray))
+
+def data_fingerprint(sample_data: Any, profile: Optional[Dict[str, Any]] = None) -> str:
+    """Hash a column's profile, or the distinct values and counts of its sample regardless of row order"""
+    if profile:
+        payload = json.dumps(profile, sort_keys=True, default=str)
+    else:
+        if _is_arrow(sample_data):
+            import pyarrow.compute as pc
+            counts = [(repr(c['values']), c['counts']) for c in pc.value_counts(sample_data.drop_null()).to_pylist()]
+        else:
+            counts = Counter(repr(item) for item in (sample_data or []) if item is not None).items()
+        payload = json.dumps(sorted(counts))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+class EntityMemo:
+    """Bounded LRU memo of the entity labels spaCy found in a value, keyed by a hash of the value's content"""
+    
+    def __init__(self, max_size: int = ENTITY_MEMO_SIZE):
+        """Initialize an empty memo with zeroed counters"""
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(value: str) -> bytes:
+        """Hash a value, so long values are not kept in memory"""
+        return hashlib.blake2b(value.encode('utf-8', 'replace'), digest_size=16).digest()
+    
+    def get(self, key: bytes) -> Optional[Tuple[str, ...]]:
+        """Return the remembered labels of a value, or None if it was not analyzed yet"""
+        with self._lock:
+            labels = self._entries.get(key)
+            if labels is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return labels
+    
+    def put(self, key: bytes, labels: Tuple[str, ...]) -> None:
+        """Remember the labels of a value, evicting the least recently used values beyond the size limit"""
+        with self._lock:
+            self._entries[key] = labels
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and size counters"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
 
 class DescriptionGenerator:
     """Generates descriptions for tables and columns using spacy and data analysis"""
     
-    def __init__(self):
-        """Initialize the description generator"""
-        self.nlp = nlp
+    def __init__(self, batch_size: int = DEFAULT_NLP_BATCH_SIZE, n_process: int = DEFAULT_NLP_PROCESSES):
+        """Initialize with the nlp.pipe batch size and number of processes used for entity recognition"""
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.entity_memo = EntityMemo()
+        # Persistent DescriptionStore reused across runs, if one is configured
+        self.store = None
+        # Descriptions of name-only columns by (name, type), shared by every table of the run
+        self._name_only: Dict[Tuple[str, str], str] = {}
+        self._name_only_lock = threading.Lock()
+        self.name_only_reused = 0
+    
+    @property
+    def nlp(self) -> Optional[Any]:
+        """The shared spaCy pipeline, loaded on first use"""
+        return get_nlp()
     
     def _clean_column_name(self, column_name: str) -> str:
         """Convert column name to readable format"""
@@ -57,9 +226,14 @@ class DescriptionGenerator:
             'common_values': None,
             'patterns': [],
             'entity_types': [],
-            'stats': {}
+            'stats': {},
+            # Distinct text values with their frequencies, entity recognition runs on them for a whole batch of columns at once
+            'value_counts': None
         }
         
+        if _is_arrow(data):
+            return self._analyze_arrow_data(data, analysis)
+        
         if not data or len(data) == 0:
             return analysis
         
@@ -99,31 +273,249 @@ class DescriptionGenerator:
             if common_values:
                 analysis['common_values'] = common_values
             
-            # NLP analysis for text data
-            sample_text = " ".join([str(item) for item in data if item is not None])
-            if len(sample_text) > 0:
-                doc = self.nlp(sample_text[:10000])  # Limit to prevent processing too much text
-                
-                # Extract entities
-                entities = Counter([ent.label_ for ent in doc.ents])
-                if entities:
-                    analysis['entity_types'] = entities.most_common(3)
+            # NLP analysis for text data, once per distinct value
+            analysis['value_counts'] = value_counts.most_common()
         
         return analysis
     
-    def generate_column_description(self, column_name: str, data_type: str, sample_data: List[Any]) -> str:
-        """Generate a description for a column based on its name and sample data"""
+    def _analyze_arrow_data(self, data: Any, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze an Arrow array with vectorized compute functions instead of per-value Python objects"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        
+        data = data.drop_null()
+        if len(data) == 0:
+            return analysis
+        
+        # Map the Arrow type onto the Python type names used by the list-based analysis
+        arrow_type = data.type
+        if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+            analysis['type'] = 'str'
+        elif pa.types.is_boolean(arrow_type):
+            analysis['type'] = 'bool'
+        elif pa.types.is_integer(arrow_type):
+            analysis['type'] = 'int'
+        elif pa.types.is_floating(arrow_type):
+            analysis['type'] = 'float'
+        elif pa.types.is_decimal(arrow_type):
+            analysis['type'] = 'Decimal'
+        elif pa.types.is_date(arrow_type):
+            analysis['type'] = 'date'
+        elif pa.types.is_temporal(arrow_type):
+            analysis['type'] = 'datetime'
+        else:
+            analysis['type'] = str(arrow_type)
+        
+        # Calculate stats for numeric data
+        if analysis['type'] in ('int', 'float', 'Decimal'):
+            numbers = data.cast(pa.float64())
+            min_max = pc.min_max(numbers)
+            analysis['stats'] = {
+                'min': min_max['min'].as_py(),
+                'max': min_max['max'].as_py(),
+                'avg': pc.mean(numbers).as_py()
+            }
+        
+        # Extract common values and entities for categorical data
+        if analysis['type'] == 'str':
+            # value_counts lists values in order of first appearance, so a stable sort matches Counter.most_common
+            counts = pc.value_counts(data).to_pylist()
+            common_values = sorted(((c['values'], c['counts']) for c in counts), key=lambda c: -c[1])[:5]
+            if common_values:
+                analysis['common_values'] = common_values
+            
+            # Only the distinct values become Python strings for entity recognition
+            analysis['value_counts'] = [(c['values'], c['counts']) for c in counts]
+        
+        return analysis
+    
+    def _add_entity_types(self, analyses: List[Dict[str, Any]]) -> None:
+        """Run spacy NER once per distinct value of every analysis in one nlp.pipe batch and add the three most common
+        entity labels, weighted by how often each value was sampled"""
+        pending = [analysis for analysis in analyses if analysis.get('value_counts')]
+        if not pending:
+            return
+        
+        nlp = self.nlp
+        if nlp is None:
+            return
+        
+        # Pick each column's most frequent values up to the text limit, and find the ones not analyzed before
+        labels: Dict[bytes, Tuple[str, ...]] = {}
+        unseen: Dict[bytes, str] = {}
+        column_values = []
+        for analysis in pending:
+            values = []
+            length = 0
+            for value, count in sorted(analysis['value_counts'], key=lambda value_count: -value_count[1]):
+                if length >= MAX_SAMPLE_TEXT_LENGTH:
+                    break
+                value = str(value)[:MAX_SAMPLE_TEXT_LENGTH - length]
+                if not value.strip():
+                    continue
+                length += len(value)
+                key = EntityMemo.key(value)
+                values.append((key, count))
+                if key not in labels and key not in unseen:
+                    known = self.entity_memo.get(key)
+                    if known is None:
+                        unseen[key] = value
+                    else:
+                        labels[key] = known
+            column_values.append(values)
+        
+        # Each distinct value is its own document, so entities can't span two values
+        if unseen:
+            keys = list(unseen)
+            docs = nlp.pipe((unseen[key] for key in keys), batch_size=self.batch_size, n_process=self.n_process)
+            for key, doc in zip(keys, docs):
+                labels[key] = tuple(ent.label_ for ent in doc.ents)
+                self.entity_memo.put(key, labels[key])
+        
+        for analysis, values in zip(pending, column_values):
+            entities = Counter()
+            for key, count in values:
+                for label in labels[key]:
+                    entities[label] += count
+            analysis['entity_types'] = entities.most_common(3) if entities else []
+    
+    def _analyze_profile(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the same analysis structure from a server-side column profile"""
+        analysis = {
+            'type': None,
+            'common_values': None,
+            'patterns': [],
+            'entity_types': [],
+            'stats': {},
+            # Distinct text values with their frequencies, entity recognition runs on them for a whole batch of columns at once
+            'value_counts': None
+        }
+        
+        category = profile.get('category')
+        if category == 'numeric' and profile.get('min') is not None:
+            analysis['type'] = 'float'
+            analysis['stats'] = {
+                'min': float(profile['min']),
+                'max': float(profile['max']),
+                'avg': float(profile['avg']) if profile.get('avg') is not None else None
+            }
+        
+        elif category == 'text' and profile.get('top_k'):
+            analysis['type'] = 'str'
+            # Top-k pairs come back most frequent first, like Counter.most_common
+            common_values = [(str(value), count) for value, count in profile['top_k'] if value is not None]
+            if common_values:
+                analysis['common_values'] = common_values
+            
+            # NLP analysis over the frequent values
+            analysis['value_counts'] = common_values
+        
+        return analysis
+    
+    def generate_column_description(self, column_name: str, data_type: str, sample_data: List[Any],
+                                    profile: Optional[Dict[str, Any]] = None) -> str:
+        """Generate a description for a column based on its name and sample data or server-side profile"""
+        return self.generate_column_descriptions([
+            {'name': column_name, 'type': data_type, 'sample_data': sample_data, 'profile': profile}
+        ])[0]
+    
+    def generate_column_descriptions(self, columns: List[Dict[str, Any]]) -> List[str]:
+        """Generate descriptions for many columns (name, type, sample_data, profile), running NER over all of them in one batch"""
+        descriptions: List[Optional[str]] = [None] * len(columns)
+        keys: List[Optional[str]] = [None] * len(columns)
+        
+        # Columns described from name and type alone are described once per run, whatever their data
+        for index, column in enumerate(columns):
+            if not self.needs_sample_data(column['name'], column['type']):
+                descriptions[index] = self._describe_name_only(column['name'], column['type'])
+        
+        # Columns with the same name, type and data as in an earlier run skip the analysis and NLP
+        if self.store is not None:
+            from utils.description_store import store_key
+            for index, column in enumerate(columns):
+                if descriptions[index] is not None:
+                    continue
+                keys[index] = store_key(column['name'], column['type'],
+                                        data_fingerprint(column.get('sample_data'), column.get('profile')))
+                stored = self.store.lookup(keys[index])
+                if stored is not None:
+                    descriptions[index] = stored
+        
+        pending = [index for index, description in enumerate(descriptions) if description is None]
+        # Analyze the profile if one was computed in the warehouse, otherwise the sample data
+        analyses = [self._analyze_profile(columns[index]['profile']) if columns[index].get('profile')
+                    else self._analyze_sample_data(columns[index].get('sample_data', [])) for index in pending]
+        self._add_entity_types(analyses)
+        for index, analysis in zip(pending, analyses):
+            column = columns[index]
+            descriptions[index] = self._describe_column(column['name'], column['type'], analysis)
+            if keys[index] is not None:
+                self.store.store(keys[index], descriptions[index])
+        return descriptions
+    
+    def needs_sample_data(self, column_name: str, data_type: str) -> bool:
+        """Check whether a column's description depends on its sampled data rather than only its name and type"""
+        return self._column_rule(column_name, data_type) in SAMPLED_RULES
+    
+    def _describe_name_only(self, column_name: str, data_type: str) -> str:
+        """Describe a column whose description depends only on its name and type, once per run"""
+        key = (column_name, data_type)
+        with self._name_only_lock:
+            description = self._name_only.get(key)
+            if description is not None:
+                self.name_only_reused += 1
+                return description
+        description = self._describe_column(column_name, data_type, self._analyze_sample_data([]))
+        with self._name_only_lock:
+            self._name_only[key] = description
+        return description
+    
+    def name_only_stats(self) -> Dict[str, int]:
+        """Return how many distinct name-only columns were described and how often a description was reused"""
+        with self._name_only_lock:
+            return {'described': len(self._name_only), 'reused': self.name_only_reused}
+    
+    def _column_rule(self, column_name: str, data_type: str) -> str:
+        """Pick the description rule for a column from its name patterns, then its data type"""
+        name = column_name.lower()
+        if re.search(r'id$|^id|_id$', name):
+            return 'id'
+        if 'date' in name or re.search(r'_dt$|_date$', name):
+            return 'date'
+        if 'amount' in name or re.search(r'_amt$|_amount$', name):
+            return 'amount'
+        if 'count' in name or 'qty' in name or 'quantity' in name:
+            return 'count'
+        if re.search(r'is_|_flag$|_flg$', name):
+            return 'flag'
+        if name in AUDIT_DESCRIPTIONS:
+            return 'audit'
+        if not data_type:
+            return 'name'
+        
+        # Extract simple type name
+        type_name = data_type.split('(')[0].lower()
+        if 'varchar' in type_name or 'char' in type_name or 'string' in type_name or 'text' in type_name:
+            return 'text'
+        if 'int' in type_name or 'number' in type_name or 'decimal' in type_name or 'float' in type_name:
+            return 'numeric'
+        if 'date' in type_name or 'time' in type_name:
+            return 'datetime'
+        if 'bool' in type_name:
+            return 'boolean'
+        return 'name'
+    
+    def _describe_column(self, column_name: str, data_type: str, analysis: Dict[str, Any]) -> str:
+        """Build a column description from its name, type and sample analysis"""
         # Clean column name to make it readable
         clean_name = self._clean_column_name(column_name)
         
-        # Analyze sample data
-        analysis = self._analyze_sample_data(sample_data)
-        
         # Start with basic description based on column name
         description = f"{clean_name}"
+        rule = self._column_rule(column_name, data_type)
         
         # Handle special column types based on name patterns
-        if re.search(r'id$|^id|_id$', column_name.lower()):
+        if rule == 'id':
             if re.search(r'^pk_|^primary_', column_name.lower()):
                 description = f"Primary identifier for {clean_name}"
             elif re.search(r'^fk_|^foreign_', column_name.lower()):
@@ -131,7 +523,7 @@ class DescriptionGenerator:
             else:
                 description = f"Identifier for {clean_name}"
         
-        elif 'date' in column_name.lower() or re.search(r'_dt$|_date$', column_name.lower()):
+        elif rule == 'date':
             if 'create' in column_name.lower() or 'insert' in column_name.lower():
                 description = f"Date when the record was created"
             elif 'update' in column_name.lower() or 'modify' in column_name.lower():
@@ -145,7 +537,7 @@ class DescriptionGenerator:
             else:
                 description = f"Date associated with {clean_name}"
         
-        elif 'amount' in column_name.lower() or re.search(r'_amt$|_amount$', column_name.lower()):
+        elif rule == 'amount':
             description = f"Monetary amount for {clean_name}"
             
             # Add range information if available
@@ -155,54 +547,36 @@ class DescriptionGenerator:
                 if min_val is not None and max_val is not None:
                     description += f" (ranges from {min_val:.2f} to {max_val:.2f})"
         
-        elif 'count' in column_name.lower() or 'qty' in column_name.lower() or 'quantity' in column_name.lower():
+        elif rule == 'count':
             description = f"Count or quantity of {clean_name}"
         
-        elif re.search(r'is_|_flag$|_flg$', column_name.lower()):
+        elif rule == 'flag':
             description = f"Flag indicating {clean_name}"
             if analysis['common_values']:
                 values = [v[0] for v in analysis['common_values']]
                 description += f" (possible values: {', '.join(str(v) for v in values)})"
         
         # Special handling for audit and SCD columns
-        elif column_name.lower() == 'adt_load_date':
-            description = 'Audit load date used for record identification across the data pipeline'
-        elif column_name.lower() == 'adt_file_source':
-            description = 'Audit file source used for record identification across the data pipeline'
-        elif column_name.lower() == 'adt_hash_key':
-            description = 'Hash key used for record identification across the data pipeline'
-        elif column_name.lower() == 'dbt_scd_id':
-            description = 'SCD type 2 identifier, used for tracking different versions of a each record'
-        elif column_name.lower() == 'dbt_updated_at':
-            description = 'SCD type 2 updated timestamp, indicating when the record was last modified'
-        elif column_name.lower() == 'dbt_valid_from':
-            description = 'SCD type 2 validity start timestamp, indicating since when the record was valid'
-        elif column_name.lower() == 'dbt_valid_to':
-            description = 'SCD type 2 validity end timestamp, indicating since when the record was valid'
-        elif column_name.lower() == 'record_sk':
-            description = 'Unique key identifier for each record'
-            
+        elif rule == 'audit':
+            description = AUDIT_DESCRIPTIONS[column_name.lower()]
+        
         # Add data type information for other columns
-        elif data_type:
-            # Extract simple type name
-            type_name = data_type.split('(')[0].lower()
-            
-            if 'varchar' in type_name or 'char' in type_name or 'string' in type_name or 'text' in type_name:
-                description = f"Text field containing {clean_name}"
-                
-                # Add common values if available
-                if analysis['common_values'] and len(analysis['common_values']) <= 3:
-                    values = [v[0] for v in analysis['common_values']]
-                    description += f" (e.g., {', '.join(str(v) for v in values)})"
-            
-            elif 'int' in type_name or 'number' in type_name or 'decimal' in type_name or 'float' in type_name:
-                description = f"Numeric value representing {clean_name}"
+        elif rule == 'text':
+            description = f"Text field containing {clean_name}"
             
-            elif 'date' in type_name or 'time' in type_name:
-                description = f"Date/time value for {clean_name}"
-            
-            elif 'bool' in type_name:
-                description = f"Boolean flag indicating {clean_name}"
+            # Add common values if available
+            if analysis['common_values'] and len(analysis['common_values']) <= 3:
+                values = [v[0] for v in analysis['common_values']]
+                description += f" (e.g., {', '.join(str(v) for v in values)})"
+        
+        elif rule == 'numeric':
+            description = f"Numeric value representing {clean_name}"
+        
+        elif rule == 'datetime':
+            description = f"Date/time value for {clean_name}"
+        
+        elif rule == 'boolean':
+            description = f"Boolean flag indicating {clean_name}"
         
         return description
     
@@ -262,13 +636,13 @@ class DescriptionGenerator:
         
         # Build a more detailed description
         if important_columns:
-            # Get unique, non-empty values
-            entities = list(set([c for c in important_columns if c]))
+            # Get unique, non-empty values in column order so the description is the same on every run
+            entities = list(dict.fromkeys(c for c in important_columns if c))
             
             if entities:
                 # Convert to readable format
                 readable_entities = [self._clean_column_name(e) for e in entities]
-                unique_entities = list(set(readable_entities))
+                unique_entities = list(dict.fromkeys(readable_entities))
                 
                 if len(unique_entities) <= 3:
                     description = f"Contains information about {', '.join(unique_entities)}"
@@ -0,0 +1,127 @@
+"""
+Persistent SQLite store of generated column descriptions, reused across runs for columns whose data is unchanged.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Columns kept in the store; the least recently used beyond this are evicted when it is closed
+DEFAULT_STORE_SIZE = 50000
+# New descriptions are committed in batches of this many, so an interrupted run keeps most of its work
+COMMIT_EVERY = 200
+
+def store_key(column_name: str, data_type: str, fingerprint: str) -> str:
+    """Hash a column's name, normalized type and data fingerprint into its store key"""
+    normalized_type = ''.join((data_type or '').split()).upper()
+    payload = json.dumps([column_name, normalized_type, fingerprint])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class DescriptionStore:
+    """Descriptions keyed by column signature, invalidated as a whole when the version changes"""
+    
+    def __init__(self, path: str, version: str, max_entries: int = DEFAULT_STORE_SIZE):
+        """Open or create the store, clearing it if it was written with another version"""
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._used: Dict[str, float] = {}
+        self._uncommitted = 0
+        self.hits = 0
+        self.misses = 0
+        self._open()
+    
+    def _open(self) -> None:
+        """Connect to the store file and check its version stamp"""
+        directory = os.path.dirname(self.path)
+        try:
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            # Workers share the connection, every access goes through the lock
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS descriptions "
+                         "(key TEXT PRIMARY KEY, description TEXT, last_used REAL)")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                if row is not None:
+                    logger.info(f"Description store {self.path} was written by rules version {row[0]}, clearing it")
+                conn.execute("DELETE FROM descriptions")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (self.version,))
+                conn.commit()
+            count = conn.execute("SELECT COUNT(*) FROM descriptions").fetchone()[0]
+            logger.info(f"Opened description store {self.path} with {count} columns")
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not open description store {self.path}, descriptions will not be reused: {e}")
+            self._conn = None
+    
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the stored description of a column, or None if it is not stored"""
+        if self._conn is None:
+            return None
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT description FROM descriptions WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Description store lookup failed: {e}")
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Recency is written back when the store is closed, so hits cost no writes
+            self._used[key] = time.time()
+        return row[0]
+    
+    def store(self, key: str, description: str) -> None:
+        """Remember the description generated for a column, committing every COMMIT_EVERY new descriptions"""
+        if self._conn is None:
+            return
+        with self._lock:
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO descriptions (key, description, last_used) "
+                                   "VALUES (?, ?, ?)", (key, description, time.time()))
+                self._uncommitted += 1
+                if self._uncommitted >= COMMIT_EVERY:
+                    self._conn.commit()
+                    self._uncommitted = 0
+            except sqlite3.Error as e:
+                logger.warning(f"Could not store column description: {e}")
+    
+    def stats(self) -> Dict[str, int]:
+        """Return hit and miss counters"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+    
+    def close(self) -> None:
+        """Record which columns were reused, evict the least recently used beyond the size limit and commit"""
+        if self._conn is None:
+            return
+        with self._lock:
+            try:
+                self._conn.executemany("UPDATE descriptions SET last_used = ? WHERE key = ?",
+                                       [(used, key) for key, used in self._used.items()])
+                evicted = self._conn.execute(
+                    "DELETE FROM descriptions WHERE key NOT IN "
+                    "(SELECT key FROM descriptions ORDER BY last_used DESC LIMIT ?)", (self.max_entries,)
+                ).rowcount
+                self._conn.commit()
+                if evicted:
+                    logger.info(f"Evicted {evicted} least recently used columns from description store {self.path}")
+            except sqlite3.Error as e:
+                logger.warning(f"Could not save description store {self.path}: {e}")
+            finally:
+                self._conn.close()
+                self._conn = None
+                self._used = {}
+                self._uncommitted = 0
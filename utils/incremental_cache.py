@@ -0,0 +1,98 @@
+"""
+Persistent on-disk cache of generated descriptions for incremental regeneration.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached entry layout changes so old files are ignored instead of misread
+CACHE_FORMAT_VERSION = 1
+
+def column_signature(columns: List[Dict[str, str]]) -> str:
+    """Hash the column names, types and nullability of a table"""
+    payload = json.dumps([[c['name'], c['type'], c.get('nullable')] for c in columns])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+class IncrementalCache:
+    """Descriptions keyed by database, schema and table, invalidated by LAST_ALTERED and column signature"""
+    
+    def __init__(self, path: str):
+        """Initialize from a cache file, starting empty if it doesn't exist or can't be read"""
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.recomputed = 0
+        self._load()
+    
+    def _load(self) -> None:
+        """Read cached entries from disk"""
+        if not os.path.exists(self.path):
+            logger.info(f"Incremental cache {self.path} not found, all tables will be profiled")
+            return
+        
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_FORMAT_VERSION:
+                logger.warning(f"Ignoring incremental cache {self.path} written by an incompatible version")
+                return
+            self._entries = data.get('entries', {})
+            logger.info(f"Loaded {len(self._entries)} cached tables from {self.path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read incremental cache {self.path}: {e}")
+    
+    def _key(self, database: str, schema: str, table: str) -> str:
+        """Build the cache key for a table"""
+        return f"{database}.{schema}.{table}"
+    
+    def lookup(self, database: str, schema: str, table: str, last_altered: Any, signature: str) -> Optional[Dict[str, Any]]:
+        """Return the cached descriptions if the table has not changed since they were generated"""
+        if last_altered is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(self._key(database, schema, table))
+        if entry and entry['last_altered'] == str(last_altered) and entry['signature'] == signature:
+            return entry
+        return None
+    
+    def store(self, database: str, schema: str, table: str, last_altered: Any, signature: str,
+              table_description: str, column_descriptions: Dict[str, str]) -> None:
+        """Remember the descriptions generated for a table"""
+        if last_altered is None:
+            return
+        with self._lock:
+            self._entries[self._key(database, schema, table)] = {
+                'last_altered': str(last_altered),
+                'signature': signature,
+                'table_description': table_description,
+                'column_descriptions': column_descriptions
+            }
+    
+    def record(self, reused: bool) -> None:
+        """Count a table as reused from the cache or recomputed"""
+        with self._lock:
+            if reused:
+                self.reused += 1
+            else:
+                self.recomputed += 1
+    
+    def save(self) -> None:
+        """Write the cache to disk atomically"""
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        with self._lock:
+            data = {'version': CACHE_FORMAT_VERSION, 'entries': self._entries}
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        logger.info(f"Saved {len(self._entries)} cached tables to {self.path}")
@@ -0,0 +1,76 @@
+"""
+Run-scoped cache for table metadata fetched from the warehouse.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sentinel so that cached "no value" results (e.g. a table without a comment) still count as hits
+_MISSING = object()
+
+class MetadataCache:
+    """Memoizes column lists, table comments and column comments for the life of a run"""
+    
+    def __init__(self):
+        """Initialize an empty cache with zeroed counters"""
+        self._entries: Dict[Tuple[str, str, str], Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, kind: str, schema: str, table: str, default: Any = None) -> Any:
+        """Return a cached value without loading it, counting the lookup as a hit or miss"""
+        with self._lock:
+            value = self._entries.get((kind, schema, table), _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+    
+    def contains(self, kind: str, schema: str, table: str) -> bool:
+        """Check whether a value is cached, without counting a hit or miss"""
+        with self._lock:
+            return (kind, schema, table) in self._entries
+    
+    def pop(self, kind: str, schema: str, table: str, default: Any = None) -> Any:
+        """Remove and return a cached value, for large entries that are only needed once"""
+        with self._lock:
+            value = self._entries.pop((kind, schema, table), _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+    
+    def put(self, kind: str, schema: str, table: str, value: Any) -> None:
+        """Store a value, e.g. one that was loaded in bulk for many tables at once"""
+        with self._lock:
+            self._entries[(kind, schema, table)] = value
+    
+    def get_or_load(self, kind: str, schema: str, table: str, loader: Callable[[], Any]) -> Any:
+        """Return the cached value or call the loader once and remember its result"""
+        with self._lock:
+            value = self._entries.get((kind, schema, table), _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+        
+        # Load outside the lock so worker threads don't serialize on each other's queries
+        value = loader()
+        with self._lock:
+            self._entries[(kind, schema, table)] = value
+        return value
+    
+    def stats(self) -> Dict[str, int]:
+        """Get hit and miss counters for the run summary"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries)
+            }
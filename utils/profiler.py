@@ -0,0 +1,182 @@
+"""
+Run profiler timing named phases, with cProfile stats and optional tracemalloc peak memory.
+"""
+
+import io
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Phases of a run, from opening the connection to writing the YAML files
+CONNECT = 'connect'
+METADATA_FETCH = 'metadata'
+PREFETCH = 'prefetch'
+SAMPLING = 'sampling'
+NLP_ANALYSIS = 'nlp'
+TABLE_BUILD = 'build'
+YAML_WRITE = 'yaml_write'
+
+# Number of allocation sites listed per phase in the memory report
+MEMORY_TOP_LINES = 10
+
+class RunProfiler:
+    """Times phases per thread, excluding nested phases, and collects cProfile stats from every worker thread"""
+    
+    def __init__(self, stats_path: Optional[str] = None, memory: bool = False, phases: bool = False):
+        """Initialize; without a stats path the profiler only times phases if asked to, otherwise phases cost nothing"""
+        self.stats_path = stats_path
+        self.enabled = stats_path is not None or phases
+        self.memory = memory and stats_path is not None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = {}
+        self._snapshots: Dict[str, Any] = {}
+        self._profiles: List[cProfile.Profile] = []
+        self._start = 0.0
+    
+    def start(self) -> None:
+        """Start profiling the calling thread, and tracing allocations if memory profiling is on"""
+        if not self.enabled:
+            return
+        if self.memory:
+            tracemalloc.start()
+        self._start = time.perf_counter()
+        self._thread_profile()
+    
+    def _thread_profile(self) -> None:
+        """Enable a cProfile profiler for the calling thread the first time it enters a phase"""
+        if self.stats_path is None or getattr(self._local, 'profile', None) is not None:
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process, and it already sees every thread
+            profile = False
+        self._local.profile = profile
+        if profile:
+            with self._lock:
+                self._profiles.append(profile)
+    
+    def phase(self, name: str) -> Any:
+        """Context manager charging the block's wall and CPU time (minus nested phases) to a phase"""
+        return self._phase(name) if self.enabled else nullcontext()
+    
+    @contextmanager
+    def _phase(self, name: str) -> Iterator[None]:
+        """Time one phase on the calling thread's phase stack"""
+        self._thread_profile()
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        
+        now, cpu = time.perf_counter(), time.thread_time()
+        if stack:
+            # Pause the enclosing phase while this one runs
+            parent = stack[-1]
+            self._charge(parent['name'], now - parent['wall'], cpu - parent['cpu'], 0)
+            if self.memory:
+                parent['peak'] = max(parent['peak'], tracemalloc.get_traced_memory()[1])
+        if self.memory:
+            tracemalloc.reset_peak()
+        frame = {'name': name, 'wall': now, 'cpu': cpu, 'peak': 0}
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            now, cpu = time.perf_counter(), time.thread_time()
+            stack.pop()
+            self._charge(name, now - frame['wall'], cpu - frame['cpu'], 1)
+            if self.memory:
+                frame['peak'] = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                self._record_peak(name, frame['peak'])
+            if stack:
+                # Resume the enclosing phase, which also held everything this one allocated
+                parent = stack[-1]
+                parent['wall'], parent['cpu'] = now, cpu
+                parent['peak'] = max(parent['peak'], frame['peak'])
+    
+    def _charge(self, name: str, wall: float, cpu: float, calls: int) -> None:
+        """Add time to a phase's totals"""
+        with self._lock:
+            total = self._totals.setdefault(name, {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'peak': 0})
+            total['calls'] += calls
+            total['wall'] += wall
+            total['cpu'] += cpu
+    
+    def _record_peak(self, name: str, peak: int) -> None:
+        """Keep a phase's highest traced memory peak, with a snapshot of the allocations when it was reached"""
+        with self._lock:
+            total = self._totals[name]
+            if peak <= total['peak']:
+                return
+            total['peak'] = peak
+        # Taking a snapshot is slow, but only happens when a phase beats its own peak
+        snapshot = tracemalloc.take_snapshot()
+        with self._lock:
+            self._snapshots[name] = snapshot
+    
+    def stop(self) -> None:
+        """Stop profiling, write the cProfile stats and memory report, and log the phase table"""
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - self._start
+        with self._lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            profile.disable()
+        
+        stats = None
+        for profile in profiles:
+            if stats is None:
+                stats = pstats.Stats(profile, stream=io.StringIO())
+            else:
+                stats.add(profile)
+        if stats is not None:
+            stats.dump_stats(self.stats_path)
+            logger.info(f"Wrote cProfile stats to {self.stats_path}, view them with "
+                        f"'python -m pstats {self.stats_path}' or snakeviz")
+        
+        if self.memory:
+            self._write_memory_report(f"{self.stats_path}.memory.txt")
+            tracemalloc.stop()
+        self.log_phases(elapsed)
+    
+    def phase_totals(self) -> Dict[str, Dict[str, float]]:
+        """Get the calls, wall seconds, CPU seconds and peak traced bytes of every phase"""
+        with self._lock:
+            return {name: dict(total) for name, total in self._totals.items()}
+    
+    def log_phases(self, elapsed: float) -> None:
+        """Log the per-phase table; times are summed over threads, so with workers they can exceed the run time"""
+        logger.info(f"Profiled run took {elapsed:.2f}s")
+        header = f"{'phase':<12} {'calls':>7} {'wall s':>9} {'cpu s':>9} {'cpu %':>6}"
+        if self.memory:
+            header += f" {'peak MiB':>9}"
+        logger.info(header)
+        for name, total in sorted(self.phase_totals().items(), key=lambda item: -item[1]['wall']):
+            cpu_share = 100 * total['cpu'] / total['wall'] if total['wall'] else 0.0
+            line = f"{name:<12} {total['calls']:>7} {total['wall']:>9.3f} {total['cpu']:>9.3f} {cpu_share:>6.0f}"
+            if self.memory:
+                line += f" {total['peak'] / (1024 * 1024):>9.1f}"
+            logger.info(line)
+    
+    def _write_memory_report(self, path: str) -> None:
+        """Write the top allocation sites of each phase at its peak"""
+        with self._lock:
+            snapshots = dict(self._snapshots)
+            totals = {name: total['peak'] for name, total in self._totals.items()}
+        with open(path, 'w') as f:
+            for name, snapshot in sorted(snapshots.items(), key=lambda item: -totals.get(item[0], 0)):
+                f.write(f"{name}: peak {totals.get(name, 0) / (1024 * 1024):.1f} MiB\n")
+                for stat in snapshot.statistics('lineno')[:MEMORY_TOP_LINES]:
+                    f.write(f"  {stat}\n")
+                f.write("\n")
+        logger.info(f"Wrote per-phase memory peaks to {path}")